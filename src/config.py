@@ -2,7 +2,7 @@
 from typing import Optional, Dict, Any, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-AllowedVectorDbProviders = Literal["chroma_lite", "chroma", "postgres"]
+AllowedVectorDbProviders = Literal["chroma_lite", "chroma", "postgres", "numpy", "hnsw_lite"]
 
 class MemoryConfig(BaseSettings):
     """Simple config class for all services used"""
@@ -14,17 +14,67 @@ class MemoryConfig(BaseSettings):
 
     GOOGLE_API_KEY: Optional[str]
 
+    # Provider specific params for llm/embedding providers,
+    # e.g. latency profile for the mock providers used in load tests
+    LLM_PROVIDER_CONFIG: Dict[str, Any] = {}
+    EMBEDDING_PROVIDER_CONFIG: Dict[str, Any] = {}
+
     # Embedding setup
     EMBEDDING_PROVIDER: str = "google"
     EMBEDDING_MODEL: str = "gemini-embedding-001"
     EMBEDDING_DIM: int = 768
 
+    # Embedding cache, LRU in memory and optionally on disk
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_DIR: Optional[str] = None
+
+    # Coalesce concurrent embedding calls into a single provider call
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+
+    # Consolidation runs are serialized per user_id/app_id/agent_name, queued
+    # batches of the same session can be merged into a single run
+    CONSOLIDATION_MERGE_BATCHES: bool = True
+    # Facts at or above the duplicate threshold (best similarity to an existing
+    # memory) are dropped and facts below the novelty threshold are created,
+    # only the band in between goes to the consolidation llm call
+    CONSOLIDATION_DUPLICATE_THRESHOLD: float = 0.95
+    CONSOLIDATION_NOVELTY_THRESHOLD: float = 0.5
+    # Scopes with at most this many memories extract and consolidate in one llm
+    # call with all their memories in the prompt, 0 always uses two calls
+    CONSOLIDATION_FUSED_MAX_MEMORIES: int = 20
+
+    # Per-session watermarks, repeated /generate calls with the full history only
+    # extract from new messages plus a few earlier ones as context. Off unless a path is set
+    EXTRACTION_WATERMARKS_PATH: Optional[str] = None
+    EXTRACTION_CONTEXT_MESSAGES: int = 4
+    # Conversations longer than this (estimated tokens) are split into windows that
+    # are extracted concurrently, each with the previous window's last turns as context
+    EXTRACTION_CHUNK_TOKENS: int = 4000
+    EXTRACTION_CHUNK_OVERLAP_TURNS: int = 2
+    # Pre-filter ruling out fact-free conversations (greetings, chatter) before
+    # the extraction llm call, "heuristic" or "none"
+    EXTRACTION_PREFILTER: str = "heuristic"
+    EXTRACTION_PREFILTER_CONFIG: Dict[str, Any] = {}
+
+    # Background /memories/generate_async jobs, persisted in a local SQLite file
+    GENERATE_JOBS_PATH: str = "./memsrv_jobs/jobs.sqlite"
+    GENERATE_JOB_WORKERS: int = 4
+    # Finished and failed jobs (with their messages) are deleted after this, 0 keeps them
+    GENERATE_JOB_RETENTION_SECONDS: float = 604800
+
+    # Repeats of a /memories/generate request within the TTL get the stored
+    # response, keyed by Idempotency-Key or the conversation hash, 0 disables
+    GENERATE_IDEMPOTENCY_TTL_SECONDS: float = 600
+    GENERATE_IDEMPOTENCY_MAX_ENTRIES: int = 10000
+
     # DB setup
     DB_PROVIDER: AllowedVectorDbProviders = "chroma_lite"
     DB_COLLECTION_NAME: str = "memories"
     DB_DESCRIPTION: Optional[str] = "Default memory collection"
 
-    # Chroma lite(local)
+    # Chroma lite(local), also the data dir of the numpy and hnsw_lite adapters
     DB_PERSIST_DIR: Optional[str] = "./chroma_db"
 
     # Postgres (for relational dbs)
@@ -7,13 +7,15 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 
-from memsrv.api.routes import memory
-from memsrv.core.memory_service import MemoryService
-from memsrv.utils.factory import LLMFactory, EmbeddingFactory, DBFactory, TelemetryFactory
+from memsrv.api.routes import memory, metrics, admin
+from memsrv.core.job_queue import GenerateJobQueue
+from memsrv.core.idempotency import GenerateResultCache
+from memsrv.utils.factory import MemoryServiceFactory, TelemetryFactory
 
 from memsrv.utils.logger import get_logger
 from memsrv.utils.exceptions import add_exception_handlers
 from memsrv.telemetry.tracing import init_tracer
+from config import memory_config
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -32,20 +34,31 @@ async def lifespan(fastapi_app: FastAPI):
     else:
         logger.info("Tracing instrumentation skipped.")
 
-    llm_instance = LLMFactory.create()
-    embedder_instance = EmbeddingFactory.create()
-    db_instance = await DBFactory.create()
+    memory_service = await MemoryServiceFactory.create()
 
-    memory_service = MemoryService(llm=llm_instance,
-                                   db_adapter=db_instance,
-                                   embedder=embedder_instance)
+    job_queue = GenerateJobQueue(memory_service=memory_service,
+                                 path=memory_config.GENERATE_JOBS_PATH,
+                                 workers=memory_config.GENERATE_JOB_WORKERS,
+                                 retention_seconds=memory_config.GENERATE_JOB_RETENTION_SECONDS)
+    await job_queue.start()
 
-    fastapi_app.include_router(memory.create_memory_router(memory_service), prefix="/api/v1")
+    result_cache = None
+    if memory_config.GENERATE_IDEMPOTENCY_TTL_SECONDS > 0:
+        result_cache = GenerateResultCache(ttl_seconds=memory_config.GENERATE_IDEMPOTENCY_TTL_SECONDS,
+                                           max_entries=memory_config.GENERATE_IDEMPOTENCY_MAX_ENTRIES)
+
+    fastapi_app.include_router(memory.create_memory_router(memory_service, job_queue, result_cache),
+                               prefix="/api/v1")
+    fastapi_app.include_router(metrics.create_metrics_router(), prefix="/api/v1")
+    fastapi_app.include_router(admin.create_admin_router(memory_service), prefix="/api/v1")
 
     logger.info("Memory Service setup complete.")
 
     yield  # The will app will run from here
 
+    await job_queue.stop()
+    await memory_service.close()
+
     if tracer:
         FastAPIInstrumentor.uninstrument_app(app)
 
@@ -0,0 +1,24 @@
+"""Admin end points for maintaining the memory store"""
+from typing import Dict, Any
+from fastapi import APIRouter, Query
+
+from memsrv.core.memory_service import MemoryService
+from memsrv.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def create_admin_router(memory_service: MemoryService):
+    """Create a router for admin/maintenance endpoints"""
+    router = APIRouter(tags=["Admin"])
+
+    @router.post("/admin/rebuild_index")
+    async def rebuild_index(force: bool = Query(False)) -> Dict[str, Any]:
+        """
+        Rebuilds the vector index concurrently if the row count drifted far
+        from what it was built for, pass force=true to rebuild anyway.
+        """
+        result = await memory_service.rebuild_index(force=force)
+        logger.info(f"Index rebuild result: {result}")
+        return result
+
+    return router
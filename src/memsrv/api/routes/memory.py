@@ -1,38 +1,84 @@
 """Actual end points will be defined here"""
 from typing import List, Dict, Optional, Any
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Header
 
 from memsrv.core.memory_service import MemoryService
+from memsrv.core.job_queue import GenerateJobQueue
+from memsrv.core.idempotency import GenerateResultCache, generate_request_key
 from memsrv.utils.logger import get_logger
 from memsrv.models.request import MemoryCreateRequest, MemoryGenerateRequest, MemoryUpdateRequest
-from memsrv.models.response import MemoriesActionResponse, MemoryResponse, GetMemoriesResponse
+from memsrv.models.response import (
+    MemoriesActionResponse, MemoryResponse, GetMemoriesResponse, JobAcceptedResponse, JobStatusResponse
+)
 
 logger = get_logger(__name__)
 
-def create_memory_router(memory_service: MemoryService):
+def create_memory_router(memory_service: MemoryService,
+                         job_queue: GenerateJobQueue,
+                         result_cache: Optional[GenerateResultCache] = None):
     """Create a router for all memory service endpoints"""
     router = APIRouter(tags=["Memory"])
 
     @router.post("/memories/generate", response_model=MemoriesActionResponse)
-    async def generate_memories(request: MemoryGenerateRequest):
+    async def generate_memories(
+        request: MemoryGenerateRequest,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+    ):
         """
         Extracts facts from a conversation and saves them with metadata.
+        Retries with the same Idempotency-Key, or the same conversation and
+        metadata when there is none, get the first execution's response.
         """
         messages = request.messages
         metadata = request.metadata
-        # We consolidate and store memories by default, pass False flag to skip consolidation
-        response = await memory_service.add_memories_from_conversation(messages=messages,
-                                                                       metadata=metadata)
-        if response:
+
+        async def generate():
+            # We consolidate and store memories by default, pass False flag to skip consolidation
+            response = await memory_service.add_memories_from_conversation(messages=messages,
+                                                                           metadata=metadata)
+            if response:
+                return {
+                    "message": f"Successfully added {len(response)} memories.",
+                    "info": response
+                }
+
             return {
-                "message": f"Successfully added {len(response)} memories.",
-                "info": response
+                "message": "No new memories were generated from the conversation.",
+                "info": []
             }
 
-        return {
-            "message": "No new memories were generated from the conversation.",
-            "info": []
-        }
+        if result_cache is None:
+            return await generate()
+
+        key = generate_request_key(messages=messages,
+                                   metadata=metadata,
+                                   idempotency_key=idempotency_key)
+        return await result_cache.run(key, generate)
+
+    @router.post("/memories/generate_async", response_model=JobAcceptedResponse, status_code=202)
+    async def generate_memories_async(request: MemoryGenerateRequest):
+        """
+        Queues the conversation for extraction and returns right away,
+        poll /memories/jobs/{job_id} for the result.
+        """
+        job = await job_queue.enqueue(messages=request.messages, metadata=request.metadata)
+        return JobAcceptedResponse(job_id=job["id"], status=job["status"])
+
+    @router.get("/memories/jobs/{job_id}", response_model=JobStatusResponse)
+    async def get_generate_job(job_id: str):
+        """Status of a queued generate job, with the memory actions once it succeeded"""
+        job = await job_queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+        return JobStatusResponse(
+            job_id=job["id"],
+            status=job["status"],
+            created_at=job["created_at"],
+            updated_at=job["updated_at"],
+            info=job["result"],
+            error=job["error"]
+        )
 
     @router.get("/memories", response_model=GetMemoriesResponse)
     async def retrieve_memories_by_metadata(
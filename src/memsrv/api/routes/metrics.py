@@ -0,0 +1,18 @@
+"""Endpoint exposing in-process service metrics"""
+from typing import Dict, Any
+from fastapi import APIRouter
+
+from memsrv.telemetry.metrics import metrics
+
+def create_metrics_router():
+    """Create a router for the service metrics endpoint"""
+    router = APIRouter(tags=["Metrics"])
+
+    @router.get("/metrics")
+    async def get_metrics() -> Dict[str, Any]:
+        """Returns a snapshot of the internal counters and gauges
+        e.g, embedding cache hits/misses
+        """
+        return metrics.snapshot()
+
+    return router
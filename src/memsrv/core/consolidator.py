@@ -6,55 +6,103 @@ from pydantic import BaseModel, Field
 from pydantic.config import ConfigDict
 
 from memsrv.llms.base_llm import BaseLLM
-from memsrv.core.prompts import FACT_CONSOLIDATION_PROMPT
+from memsrv.core.prompts import FACT_CONSOLIDATION_PROMPT, FUSED_EXTRACTION_CONSOLIDATION_PROMPT
 
 from memsrv.utils.logger import get_logger
+from memsrv.utils.tokens import estimate_tokens
+from memsrv.telemetry.metrics import metrics
 from memsrv.telemetry.tracing import traced_span
+from memsrv.telemetry.helpers import trace_token_estimate
 from memsrv.telemetry.constants import CustomSpanKinds, CustomSpanNames
 
 logger = get_logger(__name__)
 
 class Action(Enum):
-    """Allowed memory actions"""
+    """Allowed memory actions, facts that need no change are left out of the plan"""
     CREATE = "CREATE"
     UPDATE = "UPDATE"
     DELETE = "DELETE"
-    NOOP = "NOOP"
 
 class ConsolidationPlanItem(BaseModel):
-    """Single Item in the consolidation plan"""
+    """Single change in the consolidation plan"""
     model_config = ConfigDict(use_enum_values=True)
 
-    id: str = Field(description="ID of the original memory if it's part of the existing memory, if new fact a unique value")
-    text: str = Field(description="The text content of the latest fact to consider")
-    action: Action = Field(description="The action to be taken")
-    old_text: Optional[str] = Field(description="The old text of the memory in case of updation", default=None)
+    action: Action
+    id: Optional[str] = Field(description="Existing memory id, for UPDATE and DELETE", default=None)
+    text: Optional[str] = Field(description="Memory text, for CREATE and UPDATE", default=None)
 
 class ConsolidationPlan(BaseModel):
-    """Complete plan for consolidating memories"""
+    """Changes needed to consolidate the facts into the memories"""
     plan: List[ConsolidationPlanItem]
 
+def _one_line(text: str) -> str:
+    return " ".join(str(text).split())
+
+def format_memories(existing_memories: List[Dict[str, Any]]) -> str:
+    """One `id: text` line per memory, much shorter than the repr of the dicts"""
+    if not existing_memories:
+        return "(none)"
+    return "\n".join(f"{memory['id']}: {_one_line(memory['text'])}" for memory in existing_memories)
+
+def format_facts(facts: List[str]) -> str:
+    """One `- fact` line per fact"""
+    if not facts:
+        return "(none)"
+    return "\n".join(f"- {_one_line(fact)}" for fact in facts)
+
+async def _generate_plan(llm: BaseLLM, system_instruction: str, message: str) -> Dict[str, Any]:
+    """
+    Runs the consolidation call and records its estimated size on the current span,
+    the provider's real counts are on the llm span
+    """
+    response = await llm.generate_response(
+        system_instruction=system_instruction,
+        message=message,
+        response_format=ConsolidationPlan.model_json_schema()
+    )
+
+    prompt_tokens = estimate_tokens(system_instruction) + estimate_tokens(message)
+    completion_tokens = estimate_tokens(response)
+    trace_token_estimate({"prompt": prompt_tokens, "completion": completion_tokens})
+    metrics.increment("consolidation.tokens_estimate.prompt", prompt_tokens)
+    metrics.increment("consolidation.tokens_estimate.completion", completion_tokens)
+
+    parsed_plan_obj = ConsolidationPlan.model_validate_json(response)
+
+    return parsed_plan_obj.model_dump(exclude_none=True)
+
 @traced_span(CustomSpanNames.FACT_CONSOLIDATION.value, CustomSpanKinds.CHAIN.value)
 async def consolidate_facts(new_facts: List[str],
                             existing_memories: List[Dict[str, Any]],
-                            llm: BaseLLM) -> list[str]:
-    """Extracts facts using the provided LLM and provides a consolidation plan"""
+                            llm: BaseLLM) -> Dict[str, Any]:
+    """Plans the new facts against the existing memories using the provided LLM"""
 
     message = f"""Now, consolidate the facts using the following input:
-1. EXISTING_MEMORIES: List of existing memories with `id` and `text`.
-{existing_memories}
-
-2. NEW_FACTS: A list of new facts to process.
-{new_facts}
+EXISTING_MEMORIES:
+{format_memories(existing_memories)}
 
+NEW_FACTS:
+{format_facts(new_facts)}
 """
 
-    response = await llm.generate_response(
-        system_instruction=FACT_CONSOLIDATION_PROMPT,
-        message = message,
-        response_format=ConsolidationPlan.model_json_schema()
-    )
+    return await _generate_plan(llm, FACT_CONSOLIDATION_PROMPT, message)
 
-    parsed_facts_obj = ConsolidationPlan.model_validate_json(response)
+@traced_span(CustomSpanNames.FUSED_EXTRACTION_CONSOLIDATION.value, CustomSpanKinds.CHAIN.value)
+async def extract_and_consolidate_facts(parsed_messages: str,
+                                        existing_memories: List[Dict[str, Any]],
+                                        llm: BaseLLM,
+                                        context: str = "") -> Dict[str, Any]:
+    """Extracts facts from the conversation and plans them against existing memories in one llm call"""
+
+    message = f"""Now, extract the facts from the conversation and consolidate them using the following input:
+EXISTING_MEMORIES:
+{format_memories(existing_memories)}
+
+EARLIER_MESSAGES:
+{context or "(none)"}
+
+NEW_MESSAGES:
+{parsed_messages}
+"""
 
-    return parsed_facts_obj.model_dump(exclude_none=True)
+    return await _generate_plan(llm, FUSED_EXTRACTION_CONSOLIDATION_PROMPT, message)
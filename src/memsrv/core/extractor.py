@@ -1,12 +1,20 @@
 """Extracts facts from conversations using llms"""
+import asyncio
+from typing import List
+
 from pydantic import BaseModel, Field
 
 from memsrv.llms.base_llm import BaseLLM
 from memsrv.core.prompts import FACT_EXTRACTION_PROMPT
 
+from memsrv.utils.logger import get_logger
+from memsrv.utils.tokens import estimate_tokens
+from memsrv.telemetry.metrics import metrics
 from memsrv.telemetry.tracing import traced_span
 from memsrv.telemetry.constants import CustomSpanKinds, CustomSpanNames
 
+logger = get_logger(__name__)
+
 class Facts(BaseModel):
     """Pydantic models for facts extracted from conversation"""
     facts: list[str] = Field(description="The facts about the user from the conversation")
@@ -21,6 +29,10 @@ def parse_messages(messages: list) -> str:
     Returns:
         conversation string in the above format
     """
+    return "\n".join(parse_message_turns(messages))
+
+def parse_message_turns(messages: list) -> List[str]:
+    """Same as parse_messages but keeps one "User: text" / "Assistant: text" entry per turn"""
     parsed_result = []
     for message in messages:
         role = message.get("role")
@@ -31,14 +43,81 @@ def parse_messages(messages: list) -> str:
                     parsed_result.append(f"User: {text}")
                 elif role == "model":
                     parsed_result.append(f"Assistant: {text}")
-    return "\n".join(parsed_result)
+    return parsed_result
+
+def chunk_turns(turns: List[str], max_tokens: int) -> List[List[str]]:
+    """
+    Splits turns into consecutive windows of at most max_tokens,
+    a single longer turn gets a window of its own
+    """
+    windows = []
+    current, current_tokens = [], 0
+    for turn in turns:
+        tokens = estimate_tokens(turn)
+        if current and current_tokens + tokens > max_tokens:
+            windows.append(current)
+            current, current_tokens = [], 0
+        current.append(turn)
+        current_tokens += tokens
+    if current:
+        windows.append(current)
+    return windows
+
+async def extract_facts_in_chunks(turns: List[str],
+                                  llm: BaseLLM,
+                                  context_turns: List[str],
+                                  max_tokens: int,
+                                  overlap: int) -> List[str]:
+    """
+    Extracts from token bounded windows of the conversation concurrently, the
+    llm provider's rate limiter keeps the calls within its budget. Facts are
+    merged in conversation order and de-duplicated. Windows after the first
+    get the last `overlap` turns of the previous one as context.
+    """
+    windows = chunk_turns(turns, max_tokens=max_tokens)
+    if len(windows) == 1:
+        return await extract_facts(parsed_messages="\n".join(turns),
+                                   llm=llm,
+                                   context="\n".join(context_turns))
+
+    metrics.increment("extraction.chunked_conversations")
+    metrics.increment("extraction.chunks", len(windows))
+    logger.info(f"Extracting facts from {len(turns)} turns in {len(windows)} chunks.")
+
+    calls = []
+    for i, window in enumerate(windows):
+        window_context = context_turns
+        if i > 0:
+            window_context = windows[i - 1][-overlap:] if overlap else []
+        calls.append(extract_facts(parsed_messages="\n".join(window),
+                                   llm=llm,
+                                   context="\n".join(window_context)))
+    chunk_facts = await asyncio.gather(*calls)
+
+    facts, seen = [], set()
+    for fact in (fact for result in chunk_facts for fact in result):
+        key = " ".join(fact.lower().split())
+        if key not in seen:
+            seen.add(key)
+            facts.append(fact)
+    return facts
 
 @traced_span(CustomSpanNames.FACT_EXTRACTION.value, CustomSpanKinds.CHAIN.value)
-async def extract_facts(parsed_messages: str, llm: BaseLLM) -> list[str]:
-    """Extracts facts using the provided LLM"""
+async def extract_facts(parsed_messages: str, llm: BaseLLM, context: str = "") -> list[str]:
+    """
+    Extracts facts using the provided LLM, context holds earlier messages
+    that were already extracted and are only sent for coherence
+    """
+    message = "Now, extract the facts from the following conversation:\n" + parsed_messages
+    if context:
+        message = (
+            "Earlier messages, for context only. Do not extract facts from them:\n"
+            + context + "\n\n" + message
+        )
+
     response = await llm.generate_response(
         system_instruction=FACT_EXTRACTION_PROMPT,
-        message="Now, extract the facts from the following conversation:\n" + parsed_messages,
+        message=message,
         response_format=Facts.model_json_schema()
     )
 
@@ -0,0 +1,87 @@
+"""Idempotent /memories/generate, repeats of a request get the first execution's result"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from memsrv.core.extractor import parse_messages
+from memsrv.models.memory import MemoryMetadata
+
+from memsrv.utils.logger import get_logger
+from memsrv.telemetry.metrics import metrics
+
+logger = get_logger(__name__)
+
+def generate_request_key(messages: List[Dict[str, Any]],
+                         metadata: MemoryMetadata,
+                         idempotency_key: Optional[str] = None) -> str:
+    """
+    Key of a generate request, the client's Idempotency-Key scoped to the app
+    and user when given, else a hash of the normalized conversation and the
+    metadata. event_timestamp is left out since the server fills it per request.
+    """
+    scope = [metadata.app_id, metadata.user_id]
+    if idempotency_key:
+        payload = ["key", *scope, idempotency_key]
+    else:
+        conversation = " ".join(parse_messages(messages).split())
+        payload = ["hash", *scope, metadata.session_id, metadata.agent_name, conversation]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class GenerateResultCache:
+    """
+    Keeps generate responses for `ttl_seconds`, at most `max_entries` of them.
+    A repeat within the TTL gets the stored response, a repeat while the first
+    execution is still running waits for it. Failures are not stored so the
+    client's next retry runs again.
+    """
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    def _get(self, key: str) -> Optional[Any]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._results[key]
+            return None
+        return result
+
+    def _put(self, key: str, result: Any):
+        self._results[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._results.move_to_end(key)
+        # Entries share one TTL, so the oldest insert is also the first to expire
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the result stored for key, or runs compute once for all concurrent callers"""
+        result = self._get(key)
+        if result is not None:
+            metrics.increment("generate.idempotency.hits")
+            return result
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            metrics.increment("generate.idempotency.joined")
+            logger.info("Generate request is already running, waiting for its result.")
+        else:
+            metrics.increment("generate.idempotency.misses")
+            # Runs as its own task so a disconnecting first caller does not
+            # cancel the work a retry is about to wait on
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._put(key, task.result())
@@ -0,0 +1,229 @@
+"""Durable background queue for /memories/generate, backed by a local SQLite file"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from memsrv.core.memory_service import MemoryService
+from memsrv.db.executor import BlockingDBExecutor
+from memsrv.models.memory import MemoryMetadata, get_current_time
+from memsrv.telemetry.metrics import metrics
+from memsrv.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_COLUMNS = ("id", "status", "payload", "result", "error", "created_at", "updated_at")
+
+class JobStore:
+    """
+    Jobs are rows in a SQLite table, written before the job is queued so
+    a restart finds every job that was accepted but not finished.
+    """
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS generate_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS generate_jobs_status_idx
+                ON generate_jobs (status, created_at);
+            """
+        )
+        self._conn.commit()
+
+    def insert(self, job_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores a new job as QUEUED"""
+        now = get_current_time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO generate_jobs (id, status, payload, created_at, updated_at) "
+                "VALUES (?, 'QUEUED', ?, ?, ?)",
+                (job_id, json.dumps(payload), now, now)
+            )
+        return {"id": job_id, "status": "QUEUED", "created_at": now, "updated_at": now}
+
+    def set_status(self,
+                   job_id: str,
+                   status: str,
+                   result: Optional[List[Dict[str, Any]]] = None,
+                   error: Optional[str] = None):
+        """Moves a job to RUNNING, SUCCEEDED or FAILED"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE generate_jobs SET status = ?, result = ?, error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None,
+                 error, get_current_time(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the job row as a dict, None if the id is unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM generate_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished(self) -> List[str]:
+        """Ids of jobs that were queued or running when the service stopped, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM generate_jobs WHERE status IN ('QUEUED', 'RUNNING') ORDER BY created_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_finished(self, older_than: str) -> int:
+        """Deletes SUCCEEDED and FAILED jobs last updated before older_than, returns the count"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM generate_jobs WHERE status IN ('SUCCEEDED', 'FAILED') AND updated_at < ?",
+                (older_than,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        """Closes the SQLite connection"""
+        with self._lock:
+            self._conn.close()
+
+class GenerateJobQueue:
+    """
+    Accepts /memories/generate payloads and processes them on `workers`
+    concurrent tasks. Publishes `generate_jobs.queue_depth` and
+    `generate_jobs.running` gauges and enqueued/succeeded/failed counters.
+    Finished jobs are deleted `retention_seconds` after they finish, 0 keeps them.
+    """
+    def __init__(self,
+                 memory_service: MemoryService,
+                 path: str,
+                 workers: int = 4,
+                 retention_seconds: float = 7 * 24 * 3600):
+        self.memory_service = memory_service
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.store = JobStore(path)
+        # SQLite calls are blocking, one thread is enough for a single file
+        self.executor = BlockingDBExecutor(name="generate_jobs_store", max_workers=1)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+
+    def _publish_gauges(self):
+        metrics.set_gauge("generate_jobs.queue_depth", self._queue.qsize())
+        metrics.set_gauge("generate_jobs.running", self._running)
+
+    async def start(self):
+        """Requeues unfinished jobs from the store and starts the workers"""
+        pending = await self.executor.read(self.store.unfinished)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"Requeued {len(pending)} unfinished generate jobs.")
+        self._publish_gauges()
+
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"generate_job_worker_{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} generate job workers.")
+        if self.retention_seconds > 0:
+            self._tasks.append(asyncio.create_task(self._purge_periodically(),
+                                                   name="generate_job_purge"))
+
+    async def stop(self):
+        """Cancels the workers, jobs still queued or running are picked up on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.executor.shutdown()
+        self.store.close()
+
+    async def purge(self) -> int:
+        """Deletes finished jobs older than the retention, returns the count"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+        purged = await self.executor.write(self.store.purge_finished, cutoff.isoformat())
+        if purged:
+            metrics.increment("generate_jobs.purged", purged)
+            logger.info(f"Purged {purged} finished generate jobs.")
+        return purged
+
+    async def _purge_periodically(self):
+        # Every hour, or more often for retentions shorter than that
+        interval = min(self.retention_seconds, 3600)
+        while True:
+            try:
+                await self.purge()
+            except Exception as e: # pylint: disable=broad-exception-caught
+                logger.error(f"Purging generate jobs failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def enqueue(self, messages: List[Dict[str, Any]], metadata: MemoryMetadata) -> Dict[str, Any]:
+        """Persists the job and queues it, returns the stored job"""
+        payload = {"messages": messages, "metadata": metadata.model_dump()}
+        job = await self.executor.write(self.store.insert, str(uuid.uuid4()), payload)
+        self._queue.put_nowait(job["id"])
+        metrics.increment("generate_jobs.enqueued")
+        self._publish_gauges()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored job, None if the id is unknown"""
+        return await self.executor.read(self.store.get, job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._running += 1
+            self._publish_gauges()
+            try:
+                await self._process(job_id)
+            finally:
+                self._running -= 1
+                self._publish_gauges()
+                self._queue.task_done()
+
+    async def _process(self, job_id: str):
+        """Runs one job, a failure marks the job FAILED and never stops the worker"""
+        job = await self.executor.read(self.store.get, job_id)
+        if job is None:
+            logger.warning(f"Generate job {job_id} is missing from the store, skipping.")
+            return
+
+        await self.executor.write(self.store.set_status, job_id, "RUNNING")
+        # CancelledError (shutdown) is not caught, the job stays RUNNING and is requeued on restart
+        try:
+            actions = await self.memory_service.add_memories_from_conversation(
+                messages=job["payload"]["messages"],
+                metadata=MemoryMetadata(**job["payload"]["metadata"])
+            )
+        except Exception as e: # pylint: disable=broad-exception-caught
+            logger.error(f"Generate job {job_id} failed: {e}")
+            await self.executor.write(self.store.set_status, job_id, "FAILED", error=str(e))
+            metrics.increment("generate_jobs.failed")
+            return
+
+        await self.executor.write(
+            self.store.set_status, job_id, "SUCCEEDED",
+            result=[action.model_dump() for action in actions]
+        )
+        metrics.increment("generate_jobs.succeeded")
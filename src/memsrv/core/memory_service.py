@@ -1,36 +1,83 @@
 """Core MemoryService class to manage memories"""
-# pylint: disable=too-many-locals, too-many-branches
+# pylint: disable=too-many-locals, too-many-branches, too-many-positional-arguments
+import asyncio
+from functools import partial
 from typing import List, Dict, Optional, Any, Union
 
-from memsrv.core.extractor import parse_messages, extract_facts
-from memsrv.core.consolidator import consolidate_facts
+import numpy as np
+
+from memsrv.core.extractor import (
+    parse_messages, parse_message_turns, chunk_turns, extract_facts_in_chunks
+)
+from memsrv.core.consolidator import consolidate_facts, extract_and_consolidate_facts
+from memsrv.core.scheduler import ConsolidationScheduler
+from memsrv.core.watermarks import SessionWatermarkStore
+from memsrv.core.prefilter import ConversationPrefilter
 from memsrv.llms.base_llm import BaseLLM
 from memsrv.db.base_adapter import VectorDBAdapter
 from memsrv.embeddings.base_embedder import BaseEmbedding
 from memsrv.models.memory import MemoryMetadata, MemoryInDB, MemoryUpdatePayload
 from memsrv.models.request import MemoryCreateRequest, MemoryUpdateRequest
-from memsrv.models.response import ActionConfirmation, MemoryResponse
+from memsrv.models.response import ActionConfirmation, MemoryResponse, QueryResponse
 
 from memsrv.utils.logger import get_logger
 from memsrv.utils.exceptions import InvalidRequestError
 from memsrv.telemetry.tracing import traced_span
+from memsrv.telemetry.metrics import metrics
 from memsrv.telemetry.constants import CustomSpanKinds, CustomSpanNames
 
 logger = get_logger(__name__)
 
 class MemoryService:
     """The core service that handles extraction and consolidation of memories"""
-    def __init__(self, llm: BaseLLM, db_adapter: VectorDBAdapter, embedder: BaseEmbedding):
+    def __init__(self,
+                 llm: BaseLLM,
+                 db_adapter: VectorDBAdapter,
+                 embedder: BaseEmbedding,
+                 merge_consolidation_batches: bool = True,
+                 duplicate_threshold: float = 0.95,
+                 novelty_threshold: float = 0.5,
+                 watermarks: Optional[SessionWatermarkStore] = None,
+                 context_messages: int = 4,
+                 chunk_tokens: int = 4000,
+                 chunk_overlap: int = 2,
+                 prefilter: Optional[ConversationPrefilter] = None,
+                 fused_max_memories: int = 20):
         """Initializes the MemoryService with dependency injection.
 
         Args:
             llm: An instance of a class that inherits from BaseLLM.
             db_adapter: An instance of a class that inherits from VectorDBAdapter.
             embedder: An instance of a class that inherits from BaseEmbeddingProvider.
+            merge_consolidation_batches: Consolidate queued fact batches of the
+                same session together in one run.
+            duplicate_threshold: Facts at least this similar to an existing
+                memory are dropped without calling the LLM.
+            novelty_threshold: Facts less similar than this to every existing
+                memory are created without calling the LLM.
+            watermarks: Per-session watermarks, when set only messages after the
+                last extracted one are sent to the extractor.
+            context_messages: Already extracted messages sent along as context.
+            chunk_tokens: Longer conversations are extracted in windows of about
+                this many tokens, concurrently.
+            chunk_overlap: Turns of the previous window sent as context with each window.
+            prefilter: Rules out fact-free conversations before the extraction llm call.
+            fused_max_memories: Scopes with at most this many memories extract and
+                consolidate in a single llm call, 0 disables it.
         """
         self.llm = llm
         self.db = db_adapter
         self.embedder = embedder
+        self.duplicate_threshold = duplicate_threshold
+        self.novelty_threshold = novelty_threshold
+        self.watermarks = watermarks
+        self.context_messages = context_messages
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap = chunk_overlap
+        self.prefilter = prefilter
+        self.fused_max_memories = fused_max_memories
+        self.scheduler = ConsolidationScheduler(consolidate=self._consolidate_scope,
+                                                merge_batches=merge_consolidation_batches)
 
     def _format_memory_response(self,
                                fact_id: str,
@@ -43,6 +90,32 @@ class MemoryService:
             status=action
         )
 
+    def _format_update_response(self,
+                                update_items: List[MemoryUpdateRequest],
+                                updated_ids: set) -> List[ActionConfirmation]:
+        """UPDATED for ids the adapter updated, NOT_FOUND for the rest"""
+        response = []
+        for item in update_items:
+            if item.id in updated_ids:
+                response.append(self._format_memory_response(
+                    fact_id=item.id,
+                    fact_content=item.document,
+                    action="UPDATED"
+                ))
+            else:
+                response.append(self._format_memory_response(
+                    fact_id=item.id,
+                    action="NOT_FOUND",
+                    fact_content="DATA NOT FOUND"
+                ))
+        return response
+
+    async def close(self):
+        """Closes the db adapter and the watermark store on shutdown"""
+        await self.db.close()
+        if self.watermarks:
+            self.watermarks.close()
+
     async def get_memories_by_ids(self, memory_ids: List[str]) -> Dict[str, List[Any]]:
         """
         Retrieves memories for a given list of IDs.
@@ -63,16 +136,49 @@ class MemoryService:
                                              metadata: MemoryMetadata,
                                              consolidation: bool = True) -> list[str]:
         """Extracts facts from conversations and adds them to vector DB"""
-        parsed_messages = parse_messages(messages)
-
-        if not parsed_messages.strip():
+        if not parse_messages(messages).strip():
             raise InvalidRequestError("The provided list of messages was empty or invalid")
 
-        facts = await extract_facts(parsed_messages=parsed_messages,
-                                    llm=self.llm)
+        # Messages before the session's watermark were extracted by an earlier call
+        start = 0
+        if self.watermarks:
+            start = await self.watermarks.processed_count(messages, metadata)
+            metrics.increment("extraction.skipped_messages", start)
+        if start == len(messages):
+            logger.info("No new messages since the last extraction for this session.")
+            return []
+
+        turns = parse_message_turns(messages[start:])
+        context_turns = parse_message_turns(messages[max(start - self.context_messages, 0):start])
+        facts = []
+        if turns and self.prefilter and not await self.prefilter.may_contain_facts(turns):
+            logger.info("Pre-filter found no facts in the conversation, skipping extraction.")
+            metrics.increment("extraction.prefilter.skipped")
+        elif turns:
+            if self.prefilter:
+                metrics.increment("extraction.prefilter.passed")
+
+            # Small scopes get extraction and consolidation in one llm call,
+            # conversations long enough to be chunked always take two
+            if consolidation and self.fused_max_memories > 0 and \
+                    len(chunk_turns(turns, max_tokens=self.chunk_tokens)) == 1:
+                fused_actions = await self.scheduler.run_exclusive(
+                    metadata=metadata,
+                    run=partial(self._extract_and_consolidate, turns, context_turns, metadata)
+                )
+                if fused_actions is not None:
+                    await self._advance_watermark(messages, metadata)
+                    return fused_actions
+
+            facts = await extract_facts_in_chunks(turns=turns,
+                                                  llm=self.llm,
+                                                  context_turns=context_turns,
+                                                  max_tokens=self.chunk_tokens,
+                                                  overlap=self.chunk_overlap)
 
         if not facts:
             logger.info("No facts extracted from conversation.")
+            await self._advance_watermark(messages, metadata)
             return []
 
         if consolidation:
@@ -84,27 +190,121 @@ class MemoryService:
 
             response_action = await self.create_memories(data=memories_to_create)
 
+        await self._advance_watermark(messages, metadata)
         return response_action
 
-    @traced_span(CustomSpanNames.FACT_CONSOLIDATION_CHAIN.value, kind=CustomSpanKinds.CHAIN.value)
+    @traced_span(CustomSpanNames.FACT_EXTRACT_CONSOLIDATE_CHAIN.value, kind=CustomSpanKinds.CHAIN.value)
+    async def _extract_and_consolidate(self,
+                                       turns: List[str],
+                                       context_turns: List[str],
+                                       metadata: MemoryMetadata) -> Optional[List[ActionConfirmation]]:
+        """
+        Fetches all of the scope's memories and plans the conversation against them
+        in a single llm call, returns None when the scope has too many memories
+        """
+        existing = await self.search_by_metadata(filters=metadata.filterable_dict(),
+                                                 limit=self.fused_max_memories + 1)
+        if len(existing) > self.fused_max_memories:
+            metrics.increment("consolidation.fused.fallback")
+            return None
+
+        temporary_id_map = {str(i): memory.id for i, memory in enumerate(existing)}
+        existing_memories = [
+            {"id": str(i), "text": memory.document} for i, memory in enumerate(existing)
+        ]
+        logger.info(f"Existing Memories: {existing_memories}")
+
+        metrics.increment("consolidation.fused.calls")
+        consolidation_result = await extract_and_consolidate_facts(
+            parsed_messages="\n".join(turns),
+            existing_memories=existing_memories,
+            llm=self.llm,
+            context="\n".join(context_turns)
+        )
+        logger.info(f"Consolidation Plan: {consolidation_result.get('plan')}")
+
+        memories_to_add, memories_to_update, memories_to_delete = self._plan_to_changes(
+            plan=consolidation_result.get("plan", []),
+            temporary_id_map=temporary_id_map
+        )
+        return await self.apply_consolidation_plan(
+            metadata=metadata,
+            memories_to_add=memories_to_add,
+            memories_to_update=memories_to_update,
+            memories_to_delete=memories_to_delete,
+            known_embeddings={}
+        )
+
+    async def _advance_watermark(self, messages: List, metadata: MemoryMetadata):
+        """Moves the session's watermark past messages whose facts are stored"""
+        if self.watermarks:
+            await self.watermarks.advance(messages, metadata)
+
     async def consolidate_and_add_memories(self, facts: List[str], metadata: MemoryMetadata):
-        """Adds memories to db after consolidating them"""
+        """
+        Adds memories to db after consolidating them, runs for the same
+        user_id, app_id and agent_name are serialized by the scheduler
+        """
+        return await self.scheduler.submit(facts=facts, metadata=metadata)
+
+    @traced_span(CustomSpanNames.FACT_CONSOLIDATION_CHAIN.value, kind=CustomSpanKinds.CHAIN.value)
+    async def _consolidate_scope(self, facts: List[str], metadata: MemoryMetadata):
+        """Consolidates facts against the scope's similar memories and writes the plan"""
 
         filters = metadata.filterable_dict()
-        similar_memories = await self.search_similar_memories(
+        # Facts are embedded once, the vectors are reused for the search
+        # and for any fact the plan creates unchanged
+        fact_embeddings = await self.embedder.generate_embeddings(texts=facts)
+        similar_per_fact = await self.search_similar_memories_per_query(
             query_texts=facts,
             filters=filters,
-            limit=3
+            limit=3,
+            query_embeddings=fact_embeddings
         )
 
-        # For first entries, we can directly create them
-        if not similar_memories:
+        # Only facts in the ambiguous band need the LLM, near duplicates are
+        # dropped and facts unrelated to every existing memory are created as is
+        novel_facts, ambiguous_facts, similar_memories = [], [], []
+        novel_embeddings, novel_matches = [], []
+        for fact, matches, embedding in zip(facts, similar_per_fact, fact_embeddings):
+            best = max((memory.similarity for memory in matches), default=None)
+            if best is None or best < self.novelty_threshold:
+                novel_facts.append(fact)
+                novel_embeddings.append(embedding)
+                novel_matches.append(matches)
+            elif best >= self.duplicate_threshold:
+                logger.info(f"Skipping near duplicate fact: {fact}")
+                metrics.increment("consolidation.route.duplicate")
+            else:
+                ambiguous_facts.append(fact)
+                similar_memories.extend(matches)
+                metrics.increment("consolidation.route.ambiguous")
+
+        # Novel facts were only compared with stored memories, not with each other
+        novel_routes = self._route_novel_facts(novel_embeddings)
+        for fact, matches, route in zip(novel_facts, novel_matches, novel_routes):
+            metrics.increment(f"consolidation.route.{route}")
+            if route == "batch_duplicate":
+                logger.info(f"Skipping fact duplicated within the batch: {fact}")
+            elif route == "ambiguous":
+                ambiguous_facts.append(fact)
+                similar_memories.extend(matches)
+        novel_facts = [fact for fact, route in zip(novel_facts, novel_routes) if route == "novel"]
+
+        known_embeddings = dict(zip(facts, fact_embeddings))
+        if not ambiguous_facts:
             logger.info(
-                "No similar memories associated with this metadata."
-                "Skipping consolidation and adding new facts directly."
+                "No facts need consolidation for this metadata. "
+                "Skipping the consolidation llm call and adding new facts directly."
+            )
+            metrics.increment("consolidation.llm_skipped")
+            return await self.apply_consolidation_plan(
+                metadata=metadata,
+                memories_to_add=novel_facts,
+                memories_to_update=[],
+                memories_to_delete=[],
+                known_embeddings=known_embeddings
             )
-            create_request = MemoryCreateRequest(documents=facts, metadata=metadata)
-            return await self.create_memories(data=create_request)
 
         similar_memories_dict = {}
         for memory in similar_memories:
@@ -126,25 +326,73 @@ class MemoryService:
             for i, memory_item in enumerate(similar_memory_items)
         ]
 
-        logger.info(f"New facts: {facts}")
+        logger.info(f"New facts: {ambiguous_facts}")
         logger.info(f"Existing Memories: {existing_memories}")
 
-        consolidation_result = await consolidate_facts(new_facts=facts,
+        metrics.increment("consolidation.llm_calls")
+        consolidation_result = await consolidate_facts(new_facts=ambiguous_facts,
                                                        existing_memories=existing_memories,
                                                        llm=self.llm)
         logger.info(f"Consolidation Plan: {consolidation_result.get('plan')}")
+        memories_to_add, memories_to_update, memories_to_delete = self._plan_to_changes(
+            plan=consolidation_result.get("plan", []),
+            temporary_id_map=temporary_id_map
+        )
+        memories_to_add = novel_facts + memories_to_add
+
+        response_actions = await self.apply_consolidation_plan(
+            metadata=metadata,
+            memories_to_add=memories_to_add,
+            memories_to_update=memories_to_update,
+            memories_to_delete=memories_to_delete,
+            known_embeddings=known_embeddings
+        )
+
+        logger.info(response_actions)
+
+        return response_actions
+
+    def _route_novel_facts(self, embeddings: List[List[float]]) -> List[str]:
+        """
+        Routes facts that matched no stored memory by their similarity to each other:
+        "batch_duplicate" for a near copy of an earlier fact, "ambiguous" when two of
+        them are related enough for the llm to decide, "novel" otherwise
+        """
+        if len(embeddings) < 2:
+            return ["novel"] * len(embeddings)
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        similarities = matrix @ matrix.T
+
+        routes, kept = ["novel"] * len(embeddings), []
+        for i in range(len(embeddings)):
+            if any(similarities[i, j] >= self.duplicate_threshold for j in kept):
+                routes[i] = "batch_duplicate"
+                continue
+            related = [j for j in kept if similarities[i, j] >= self.novelty_threshold]
+            if related:
+                for j in (i, *related):
+                    routes[j] = "ambiguous"
+            kept.append(i)
+        return routes
+
+    def _plan_to_changes(self, plan: List[Dict[str, Any]], temporary_id_map: Dict[str, str]):
+        """Splits an llm consolidation plan into texts to add, updates and ids to delete"""
         memories_to_add = []
         memories_to_update = []
         memories_to_delete = []
-        response_actions = []
 
-        for plan_item in consolidation_result.get("plan", []):
+        for plan_item in plan:
 
             temporary_id = plan_item.get("id")
             text = plan_item.get("text")
             action = plan_item.get("action")
 
-            if action == "CREATE":
+            if action in ("CREATE", "UPDATE") and not text:
+                logger.error(f"No `text` provided by llm for {action}, skipping.")
+            elif action == "CREATE":
                 logger.info(f"Adding: {text}")
                 memories_to_add.append(text)
             elif action == "UPDATE":
@@ -169,20 +417,139 @@ class MemoryService:
                 else:
                     logger.error("Invalid `id` provided by llm, skipping deletion.")
 
-        if memories_to_add:
-            create_request = MemoryCreateRequest(documents=memories_to_add,
-                                                 metadata=metadata)
-            response_actions.extend(await self.create_memories(data=create_request))
+        return memories_to_add, memories_to_update, memories_to_delete
+
+    @traced_span(kind=CustomSpanKinds.CHAIN.value)
+    async def apply_consolidation_plan(self,
+                                       metadata: MemoryMetadata,
+                                       memories_to_add: List[str],
+                                       memories_to_update: List[MemoryUpdateRequest],
+                                       memories_to_delete: List[str],
+                                       known_embeddings: Dict[str, List[float]]):
+        """
+        Writes a consolidation plan as one unit. Adapters with transactions commit it
+        together, others run the writes concurrently and undo them if any write fails.
+        """
+        # Only texts the plan rewrote need embedding, all of them in one call
+        new_texts = list(dict.fromkeys(
+            text for text in memories_to_add + [item.document for item in memories_to_update]
+            if text not in known_embeddings
+        ))
+
+        async def embed_new_texts():
+            if new_texts:
+                new_embeddings = await self.embedder.generate_embeddings(texts=new_texts)
+                known_embeddings.update(zip(new_texts, new_embeddings))
+
+        async def take_snapshot():
+            # Prior state of touched memories, used to undo a partially applied plan
+            touched_ids = [item.id for item in memories_to_update] + memories_to_delete
+            if self.db.supports_transactions or not touched_ids:
+                return None
+            return await self.db.get_by_ids(ids=touched_ids)
+
+        _, snapshot = await asyncio.gather(embed_new_texts(), take_snapshot())
+
+        add_items = [
+            MemoryInDB(document=text, embedding=known_embeddings[text], metadata=metadata)
+            for text in memories_to_add
+        ]
+        update_payloads = [
+            MemoryUpdatePayload(id=item.id,
+                                document=item.document,
+                                embedding=known_embeddings[item.document])
+            for item in memories_to_update
+        ]
 
-        if memories_to_update:
-            response_actions.extend(await self.update_memories(update_items=memories_to_update))
+        if self.db.supports_transactions:
+            added_ids, updated_ids, deleted_ids = await self.db.apply_changes(
+                add_items=add_items,
+                update_items=update_payloads,
+                delete_ids=memories_to_delete
+            )
+        else:
+            async def noop():
+                return []
+
+            results = await asyncio.gather(
+                self.db.add(items=add_items) if add_items else noop(),
+                self.db.update(items=update_payloads) if update_payloads else noop(),
+                self.db.delete(fact_ids=memories_to_delete) if memories_to_delete else noop(),
+                return_exceptions=True
+            )
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                await self._undo_partial_plan(results, snapshot)
+                raise errors[0]
+            added_ids, updated_ids, deleted_ids = results
+
+        response = [
+            self._format_memory_response(fact_id=fact_id, fact_content=item.document, action="CREATED")
+            for fact_id, item in zip(added_ids, add_items)
+        ]
+        response.extend(self._format_update_response(memories_to_update, set(updated_ids)))
+        response.extend(
+            self._format_memory_response(fact_id=fact_id, action="DELETED")
+            for fact_id in deleted_ids
+        )
+        return response
 
-        if memories_to_delete:
-            response_actions.extend(await self.delete_memories(memory_ids=memories_to_delete))
+    async def _undo_partial_plan(self, results: List[Any], snapshot: Optional[QueryResponse]):
+        """
+        Compensates the writes of a plan that did succeed: added memories are removed,
+        updated and deleted ones are restored from the snapshot taken before the plan ran.
+        """
+        added_ids, updated_ids, deleted_ids = [
+            [] if isinstance(result, BaseException) else result for result in results
+        ]
+        if not (added_ids or updated_ids or deleted_ids):
+            return
+        logger.warning(
+            f"Consolidation plan partially failed, undoing {len(added_ids)} adds, "
+            f"{len(updated_ids)} updates and {len(deleted_ids)} deletes."
+        )
 
-        logger.info(response_actions)
+        previous = {}
+        if snapshot is not None:
+            previous = {
+                fact_id: (snapshot.documents[0][i], snapshot.metadatas[0][i])
+                for i, fact_id in enumerate(snapshot.ids[0])
+            }
+        restore_ids = [fact_id for fact_id in updated_ids + deleted_ids if fact_id in previous]
+        old_embeddings = {}
+        if restore_ids:
+            old_embeddings = dict(zip(restore_ids, await self.embedder.generate_embeddings(
+                texts=[previous[fact_id][0] for fact_id in restore_ids]
+            )))
+
+        undo_steps = []
+        if added_ids:
+            undo_steps.append(self.db.delete(fact_ids=added_ids))
+        restore_updates = [
+            MemoryUpdatePayload(id=fact_id,
+                                document=previous[fact_id][0],
+                                embedding=old_embeddings[fact_id],
+                                updated_at=previous[fact_id][1].get("updated_at"))
+            for fact_id in updated_ids if fact_id in previous
+        ]
+        if restore_updates:
+            undo_steps.append(self.db.update(items=restore_updates))
+        restore_deletes = [
+            MemoryInDB(id=fact_id,
+                       document=previous[fact_id][0],
+                       embedding=old_embeddings[fact_id],
+                       metadata=MemoryMetadata(**previous[fact_id][1]),
+                       created_at=previous[fact_id][1].get("created_at"),
+                       updated_at=previous[fact_id][1].get("updated_at"))
+            for fact_id in deleted_ids if fact_id in previous
+        ]
+        if restore_deletes:
+            undo_steps.append(self.db.add(items=restore_deletes))
 
-        return response_actions
+        # The original failure is what gets raised, undo failures are only logged
+        for result in await asyncio.gather(*undo_steps, return_exceptions=True):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to undo partially applied consolidation plan: {result}")
 
     @traced_span(CustomSpanNames.CREATE_MEMORIES.value, kind=CustomSpanKinds.CHAIN.value)
     async def create_memories(self, data: MemoryCreateRequest):
@@ -231,7 +598,10 @@ class MemoryService:
 
     @traced_span(CustomSpanNames.UPDATE_MEMORIES.value, kind=CustomSpanKinds.CHAIN.value)
     async def update_memories(self, update_items: List[MemoryUpdateRequest]):
-        """Updates memory with given id and fact content"""
+        """
+        Updates memory with given id and fact content, the adapter only
+        updates ids that exist so missing ones come back as NOT_FOUND
+        """
 
         new_facts = [items.document for items in update_items]
         new_embeddings = await self.embedder.generate_embeddings(texts=new_facts)
@@ -245,47 +615,16 @@ class MemoryService:
             for i, update_item in enumerate(update_items)
         ]
 
-        updated_memories_id = await self.db.update(items=items)
+        updated_memories_id = set(await self.db.update(items=items))
 
-        response = []
-        for i, item in enumerate(update_items):
-            response.append(
-                self._format_memory_response(
-                    fact_id=updated_memories_id[i],
-                    fact_content=item.document,
-                    action="UPDATED"
-                )
-            )
-
-        return response
+        return self._format_update_response(update_items, updated_memories_id)
 
     @traced_span(CustomSpanNames.UPDATE_MEMORIES_API.value, kind=CustomSpanKinds.CHAIN.value)
     async def update_raw_memories(self, update_items: List[MemoryUpdateRequest]):
-        """API facing update memories method, validates if ids exists and then updates"""
-        item_ids = [update_item.id for update_item in update_items]
+        """API facing update memories method, reports ids that don't exist as NOT_FOUND"""
 
-        existing_ids = await self.get_memories_by_ids(memory_ids=item_ids)
-
-        items_to_update = []
-        response_action = []
-        partial_failure = False
-        # TODO: check if set operation speeds up things here
-        for item in update_items:
-            if item.id in existing_ids.ids[0]:
-                items_to_update.append(MemoryUpdateRequest(
-                    id=item.id,
-                    document=item.document
-                ))
-            else:
-                partial_failure = True
-                response_action.append(self._format_memory_response(
-                    fact_id=item.id,
-                    action="NOT_FOUND",
-                    fact_content="DATA NOT FOUND"
-                ))
-
-        if items_to_update:
-            response_action.extend(await self.update_memories(update_items=items_to_update))
+        response_action = await self.update_memories(update_items=update_items)
+        partial_failure = any(action.status == "NOT_FOUND" for action in response_action)
 
         return response_action, partial_failure
 
@@ -308,18 +647,14 @@ class MemoryService:
 
     @traced_span(CustomSpanNames.DELETE_MEMORIES_API.value, kind=CustomSpanKinds.CHAIN.value)
     async def delete_raw_memories_by_id(self, memory_ids: List[str]):
-        """API facing method for deleting memories by id, validates them before deleting"""
+        """API facing method for deleting memories by id, reports ids that don't exist as NOT_FOUND"""
 
-        existing_ids = await self.get_memories_by_ids(memory_ids=memory_ids)
+        response_action = await self.delete_memories(memory_ids=memory_ids)
 
-        ids_to_delete = []
-        response_action = []
+        deleted_ids = {action.id for action in response_action}
         partial_failure = False
-        # TODO: check if set operation speeds up things here
         for mem_id in memory_ids:
-            if mem_id in existing_ids.ids[0]:
-                ids_to_delete.append(mem_id)
-            else:
+            if mem_id not in deleted_ids:
                 partial_failure = True
                 response_action.append(self._format_memory_response(
                     fact_id=mem_id,
@@ -327,11 +662,12 @@ class MemoryService:
                     fact_content="DATA NOT FOUND"
                 ))
 
-        if ids_to_delete:
-            response_action.extend(await self.delete_memories(memory_ids=ids_to_delete))
-
         return response_action, partial_failure
 
+    async def rebuild_index(self, force: bool = False) -> Dict[str, Any]:
+        """Admin op, rebuilds the vector index if the db adapter supports it"""
+        return await self.db.rebuild_index(force=force)
+
     # TODO: Add delete by user_id and app_ids
     @traced_span(kind=CustomSpanKinds.CHAIN.value)
     async def search_by_metadata(self, filters: Dict[str, Any] = None, limit: int = 20):
@@ -358,19 +694,38 @@ class MemoryService:
     async def search_similar_memories(self,
                                       query_texts: Union[str, List[str]],
                                       filters: Dict[str, Any] = None,
-                                      limit: int = 20):
-        """Queries vector db and get memories similar to query and applies filters"""
+                                      limit: int = 20,
+                                      query_embeddings: Optional[List[List[float]]] = None):
+        """
+        Queries vector db and get memories similar to query and applies filters.
+        Callers that already embedded the queries can pass the embeddings.
+        """
         # FIXME: Since this accepts bulk operation, it should result in
         # [results1, results2...] but we just add everything to a single list for now
+        per_query = await self.search_similar_memories_per_query(query_texts=query_texts,
+                                                                 filters=filters,
+                                                                 limit=limit,
+                                                                 query_embeddings=query_embeddings)
+        return [memory for memories in per_query for memory in memories]
+
+    @traced_span(kind=CustomSpanKinds.CHAIN.value)
+    async def search_similar_memories_per_query(self,
+                                                query_texts: Union[str, List[str]],
+                                                filters: Dict[str, Any] = None,
+                                                limit: int = 20,
+                                                query_embeddings: Optional[List[List[float]]] = None
+                                                ) -> List[List[MemoryResponse]]:
+        """Same as search_similar_memories but keeps one list of memories per query"""
         if isinstance(query_texts, str):
             query_texts = [query_texts]
 
-        query_embeddings = await self.embedder.generate_embeddings(texts=query_texts)
+        if query_embeddings is None:
+            query_embeddings = await self.embedder.generate_embeddings(texts=query_texts)
 
         results = await self.db.query_by_similarity(query_embeddings=query_embeddings,
                                                     filters=filters,
                                                     top_k=limit)
-        memories = []
+        per_query = []
 
         for query_index in range(len(query_texts)): # pylint: disable=consider-using-enumerate
             ids = results.ids[query_index]
@@ -378,6 +733,7 @@ class MemoryService:
             metadatas = results.metadatas[query_index]
             distances = results.distances[query_index]
 
+            memories = []
             for i in range(len(ids)): # pylint: disable=consider-using-enumerate
                 memories.append(
                     MemoryResponse(
@@ -389,5 +745,6 @@ class MemoryService:
                         updated_at=metadatas[i].get("updated_at")
                     )
                 )
+            per_query.append(memories)
 
-        return memories
+        return per_query
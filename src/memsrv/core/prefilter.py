@@ -0,0 +1,58 @@
+"""Cheap checks that rule out fact-free conversations before the extraction llm call"""
+# pylint: disable=unnecessary-pass
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+FIRST_PERSON_WORDS = {
+    "i", "i'm", "im", "i've", "ive", "i'd", "i'll", "me", "my", "mine", "myself",
+    "we", "we're", "our", "ours", "us",
+}
+
+# Affirmations and negations ("yes", "no", "sure", "ok") are left out on purpose,
+# they may answer an assistant question from this or an earlier request
+CHATTER_WORDS = {
+    "hi", "hello", "hey", "thanks", "thank", "you", "cool", "bye", "goodbye",
+    "nice", "morning", "evening", "how", "are", "what", "is", "up", "can", "help",
+    "please", "the", "a", "it",
+}
+
+_WORD = re.compile(r"[\w']+")
+
+class ConversationPrefilter(ABC):
+    """Decides whether a conversation is worth sending to the extractor"""
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+
+    @abstractmethod
+    async def may_contain_facts(self, turns: List[str]) -> bool:
+        """
+        False only when the turns ("User: ..." / "Assistant: ...") surely hold no
+        facts about the user, implementations should favour recall over precision
+        """
+        pass
+
+class HeuristicPrefilter(ConversationPrefilter):
+    """
+    Facts come from user turns, so a conversation is skipped only when every
+    user turn is short, has no first person word and is made of chatter words
+    (greetings, thanks, acknowledgements). Anything non-ASCII is kept since
+    the word lists are English only. Config: `max_chatter_words`.
+    """
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
+        self.max_chatter_words = int(self.config.get("max_chatter_words", 8))
+
+    def _is_chatter(self, text: str) -> bool:
+        if not text.isascii():
+            return False
+        words = [word.lower() for word in _WORD.findall(text)]
+        if len(words) > self.max_chatter_words:
+            return False
+        if any(word in FIRST_PERSON_WORDS for word in words):
+            return False
+        return all(word in CHATTER_WORDS for word in words)
+
+    async def may_contain_facts(self, turns: List[str]) -> bool:
+        user_turns = [turn[len("User: "):] for turn in turns if turn.startswith("User: ")]
+        return any(not self._is_chatter(text) for text in user_turns)
@@ -48,18 +48,21 @@ Output: {"facts": ["I love sci-fi tv shows", "Watched The Foundation and Westwor
 """
 # TODO: Add few shot
 FACT_CONSOLIDATION_PROMPT = """You are a Memory Manager.
-Your task is to process new facts against existing memories in the database and decide on one of four actions: ADD, UPDATE, DELETE, or NOOP.
+Your task is to process new facts against existing memories in the database and list the changes needed: CREATE, UPDATE or DELETE.
+
+Input:
+- EXISTING_MEMORIES: one memory per line as `id: text`.
+- NEW_FACTS: one fact per line as `- fact`.
 
 Actions:
 - CREATE: The fact is entirely new information, it must be created newly.
 - UPDATE: The fact refines, corrects, or is a more detailed version of an existing memory and must be updated. Only if the new fact has more info than existing memory, it must be updated.
 - DELETE: The fact directly contradicts an existing memory and should be deleted.
-- NOOP: The fact is a duplicate or the existing memory is already sufficient, hence no operation needed.
 
 Instructions:
 - Analyze the `NEW_FACTS` against the `EXISTING_MEMORIES`.
-- For `UPDATE`, `DELETE` and `NOOP`, you MUST use the `id` from the existing memory.
-- For `CREATE`, use a **new** unique integer `id`, not present in existing memory ids.
+- List only changes. A fact that is a duplicate or already covered by an existing memory gets no entry. If nothing changes, return {"plan": []}.
+- For `UPDATE` and `DELETE`, you MUST use the `id` from the existing memory. `CREATE` takes no `id`, `DELETE` takes no `text`.
 - UPDATE must be used **only** if the new fact contains all of the old memory's meaning AND adds new, directly related detail to it.**
     - The updated memory must be a **logical superset** of the original — the original memory should be **fully preserved** inside the new one.
     - Example: "I like to play cricket" -> "I love playing cricket with friends"
@@ -68,15 +71,32 @@ Instructions:
 - Respond only with a schema provided. Do not add any other text or explanations.
 
 **Example Output Format:**
-{
-    "plan": [
-        {
-            "id": "1",
-            "text": "memory content to use",
-            "action": "<CREATE|UPDATE|DELETE|NOOP>",
-            "old_text": "old memory content"  // Required only for "UPDATE" event
-        }
-    ]
-}
+{"plan": [{"action": "CREATE", "text": "new memory"}, {"action": "UPDATE", "id": "1", "text": "updated memory"}, {"action": "DELETE", "id": "2"}]}
+"""
+
+FUSED_EXTRACTION_CONSOLIDATION_PROMPT = """You are a Memory Manager.
+Your task is to read a conversation between a user and an assistant, extract the personal facts, preferences and important details shared by the user, and list the changes they need in the existing memories: CREATE, UPDATE or DELETE.
+
+Input:
+- EXISTING_MEMORIES: one memory per line as `id: text`.
+- EARLIER_MESSAGES and NEW_MESSAGES: one `User: ...` or `Assistant: ...` turn per line.
 
+Extraction guidelines:
+- Extract only from the `NEW_MESSAGES`, `EARLIER_MESSAGES` are context only.
+- Write facts as short, clear statements in the same language as the user's message.
+- Greetings and chatter hold no facts.
+
+Actions:
+- CREATE: The fact is entirely new information, it must be created newly.
+- UPDATE: The fact refines, corrects, or is a more detailed version of an existing memory. The updated text must keep all of the old memory's meaning and add directly related detail.
+- DELETE: The fact directly contradicts an existing memory and should be deleted.
+
+Instructions:
+- List only changes. A fact that is a duplicate or already covered by an existing memory gets no entry. If nothing changes, return {"plan": []}.
+- For `UPDATE` and `DELETE`, you MUST use the `id` from the existing memory. `CREATE` takes no `id`, `DELETE` takes no `text`.
+- Do **NOT** use UPDATE if the fact introduces separate information, even if it shares a general theme. Use CREATE instead.
+- Respond only with the schema provided. Do not add any other text or explanations.
+
+**Example Output Format:**
+{"plan": [{"action": "CREATE", "text": "new memory"}, {"action": "UPDATE", "id": "1", "text": "updated memory"}, {"action": "DELETE", "id": "2"}]}
 """
@@ -0,0 +1,138 @@
+"""Serializes consolidation per metadata scope, different scopes run in parallel"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from memsrv.models.memory import MemoryMetadata
+
+from memsrv.utils.logger import get_logger
+from memsrv.telemetry.metrics import metrics
+
+logger = get_logger(__name__)
+
+ConsolidateFn = Callable[[List[str], MemoryMetadata], Awaitable[List[Any]]]
+
+class _PendingBatch:
+    """Facts of a single caller waiting for their scope, or an exclusive run"""
+    def __init__(self,
+                 facts: List[str],
+                 metadata: MemoryMetadata,
+                 future: asyncio.Future,
+                 run: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.facts = facts
+        self.metadata = metadata
+        self.future = future
+        self.run = run
+
+    def merge_key(self) -> Optional[Dict[str, Any]]:
+        """Batches with the same key would write identical metadata, exclusive runs never merge"""
+        if self.run is not None:
+            return None
+        return self.metadata.model_dump(exclude={"event_timestamp"})
+
+class ConsolidationScheduler:
+    """
+    Consolidation reads similar memories, asks the LLM for a plan and then
+    writes it, two runs for the same scope (user_id, app_id, agent_name)
+    overlapping would plan against the same rows. Runs are queued per scope
+    and a single task drains each queue, scopes never wait on each other.
+    With merge_batches, queued batches of the same session are consolidated
+    together in one run and every merged caller gets the run's actions.
+    """
+    def __init__(self, consolidate: ConsolidateFn, merge_batches: bool = True):
+        self.consolidate = consolidate
+        self.merge_batches = merge_batches
+        self._pending: Dict[Tuple, List[_PendingBatch]] = {}
+        self._workers: Dict[Tuple, asyncio.Task] = {}
+
+    @staticmethod
+    def scope_key(metadata: MemoryMetadata) -> Tuple:
+        """Scope used for similarity search, consolidation within it is serialized"""
+        return tuple(sorted(metadata.filterable_dict().items()))
+
+    async def submit(self, facts: List[str], metadata: MemoryMetadata) -> List[Any]:
+        """Queues the facts behind earlier runs of the same scope and waits for the result"""
+        return await self._enqueue(_PendingBatch(
+            facts, metadata, asyncio.get_running_loop().create_future()
+        ))
+
+    async def run_exclusive(self, metadata: MemoryMetadata, run: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs `run` in the scope's queue, so it never overlaps other runs for the scope"""
+        return await self._enqueue(_PendingBatch(
+            [], metadata, asyncio.get_running_loop().create_future(), run=run
+        ))
+
+    async def _enqueue(self, batch: _PendingBatch) -> Any:
+        """Queues the batch and starts the scope's drain task if needed"""
+        key = self.scope_key(batch.metadata)
+        self._pending.setdefault(key, []).append(batch)
+
+        if key in self._workers:
+            metrics.increment("consolidation_scheduler.queued")
+        else:
+            self._workers[key] = asyncio.create_task(self._run_scope(key))
+        metrics.set_gauge("consolidation_scheduler.active_scopes", len(self._workers))
+
+        return await batch.future
+
+    def _next_group(self, queue: List[_PendingBatch]) -> List[_PendingBatch]:
+        """Takes the oldest batch, plus the queued ones it can be merged with"""
+        group = [queue.pop(0)]
+        if self.merge_batches and group[0].run is None:
+            merge_key = group[0].merge_key()
+            rest = []
+            for batch in queue:
+                (group if batch.merge_key() == merge_key else rest).append(batch)
+            queue[:] = rest
+        return group
+
+    @staticmethod
+    def _resolve(group: List[_PendingBatch],
+                 actions: Optional[List[Any]] = None,
+                 error: Optional[Exception] = None):
+        """Hands the run's actions (or its error) to every caller still waiting"""
+        for batch in group:
+            if batch.future.done():
+                continue
+            if error is not None:
+                batch.future.set_exception(error)
+            else:
+                batch.future.set_result(actions)
+
+    async def _run_scope(self, key: Tuple):
+        """Drains the scope's queue one run at a time"""
+        try:
+            queue = self._pending[key]
+            while queue:
+                group = self._next_group(queue)
+                # Callers that gave up while queued don't need a run
+                group = [batch for batch in group if not batch.future.done()]
+                if not group:
+                    continue
+
+                facts = list(dict.fromkeys(fact for batch in group for fact in batch.facts))
+                if len(group) > 1:
+                    metrics.increment("consolidation_scheduler.merged_batches", len(group) - 1)
+                    logger.info(f"Consolidating {len(group)} queued batches as one run.")
+                metrics.increment("consolidation_scheduler.runs")
+
+                try:
+                    if group[0].run is not None:
+                        actions = await group[0].run()
+                    else:
+                        actions = await self.consolidate(facts, group[0].metadata)
+                except asyncio.CancelledError:
+                    for batch in group:
+                        batch.future.cancel()
+                    raise
+                except Exception as e: # pylint: disable=broad-exception-caught
+                    self._resolve(group, error=e)
+                    continue
+
+                self._resolve(group, actions=actions)
+        finally:
+            # No await since the last empty check, so only a cancelled drain leaves batches behind
+            for batch in self._pending.pop(key, []):
+                if not batch.future.done():
+                    batch.future.cancel()
+            self._workers.pop(key, None)
+            metrics.set_gauge("consolidation_scheduler.active_scopes", len(self._workers))
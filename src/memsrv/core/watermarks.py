@@ -0,0 +1,103 @@
+"""Per-session watermarks so repeated /generate calls only extract from new messages"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from memsrv.models.memory import MemoryMetadata, get_current_time
+
+from memsrv.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def hash_messages(messages: List[Dict[str, Any]]) -> str:
+    """Content hash of a message prefix, detects histories that were edited or truncated"""
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(json.dumps(message, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+class SessionWatermarkStore:
+    """
+    Keeps, per (app_id, user_id, session_id, agent_name), how many messages were
+    already extracted and the hash of that prefix, in a small SQLite file.
+    Agents sharing a session each extract the whole history once.
+    """
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(session_watermarks)")]
+        if columns and "agent_name" not in columns:
+            # Watermarks are only an optimization, old per-session ones are dropped
+            logger.warning(
+                "Dropping session watermarks without agent_name, sessions are extracted once more."
+            )
+            self._conn.execute("DROP TABLE session_watermarks")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS session_watermarks (
+                app_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                agent_name TEXT NOT NULL,
+                message_count INTEGER NOT NULL,
+                prefix_hash TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (app_id, user_id, session_id, agent_name)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(metadata: MemoryMetadata) -> Tuple[str, str, str, str]:
+        return (metadata.app_id, metadata.user_id, metadata.session_id, metadata.agent_name)
+
+    def _get(self, key: Tuple[str, str, str, str]) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT message_count, prefix_hash FROM session_watermarks "
+                "WHERE app_id = ? AND user_id = ? AND session_id = ? AND agent_name = ?",
+                key
+            ).fetchone()
+
+    def _set(self, key: Tuple[str, str, str, str], message_count: int, prefix_hash: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO session_watermarks VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (app_id, user_id, session_id, agent_name) DO UPDATE SET "
+                "message_count = excluded.message_count, prefix_hash = excluded.prefix_hash, "
+                "updated_at = excluded.updated_at",
+                (*key, message_count, prefix_hash, get_current_time())
+            )
+
+    def close(self):
+        """Closes the SQLite connection"""
+        with self._lock:
+            self._conn.close()
+
+    async def processed_count(self, messages: List[Dict[str, Any]], metadata: MemoryMetadata) -> int:
+        """
+        Number of leading messages already extracted for this session, 0 when
+        there is no watermark or the stored prefix no longer matches the history
+        """
+        stored = await asyncio.to_thread(self._get, self._key(metadata))
+        if stored is None:
+            return 0
+        message_count, prefix_hash = stored
+        if message_count > len(messages) or hash_messages(messages[:message_count]) != prefix_hash:
+            logger.info(f"History of session {metadata.session_id} changed, extracting from the start.")
+            return 0
+        return message_count
+
+    async def advance(self, messages: List[Dict[str, Any]], metadata: MemoryMetadata):
+        """Marks all the given messages as extracted"""
+        await asyncio.to_thread(self._set, self._key(metadata), len(messages), hash_messages(messages))
@@ -1,11 +1,12 @@
 """Chroma db implementation using client-server chroma setup"""
 # pylint: disable=too-many-positional-arguments, signature-differs
-from typing import Dict, Any
+from typing import Dict, Any, List
 import chromadb
+from chromadb.errors import NotFoundError
 
 from memsrv.db.base_adapter import VectorDBAdapter
 from memsrv.models.response import QueryResponse
-from memsrv.db.utils import serialize_items
+from memsrv.db.utils import serialize_items, to_similarities
 
 from memsrv.utils.logger import get_logger
 from memsrv.telemetry.tracing import traced_span
@@ -19,12 +20,13 @@ class ChromaDBAdapter(VectorDBAdapter):
         super().__init__(**kwargs)
         self._client_kwargs = {"host": self.host, "port": self.port}
         self.client = None
+        # Resolved once in setup_database, refreshed if the collection is recreated
+        self.collection = None
 
     async def setup_database(self):
 
         self.client = await chromadb.AsyncHttpClient(**self._client_kwargs)
 
-        # TODO: Chrom returns 1-x value, we need x for similarity
         await self.create_collection(
             collection_name=self.collection_name,
             metadata={
@@ -52,22 +54,44 @@ class ChromaDBAdapter(VectorDBAdapter):
 
         return filters
 
+    async def _get_collection(self):
+        """Returns the cached collection handle, resolving it if needed"""
+        if self.collection is None:
+            self.collection = await self.client.get_collection(name=self.collection_name)
+        return self.collection
+
+    async def _call(self, method: str, **kwargs):
+        """
+        Runs a collection method on the cached handle. A recreated collection
+        gets a new id, so the handle is resolved again and the call retried once.
+        """
+        collection = await self._get_collection()
+        try:
+            return await getattr(collection, method)(**kwargs)
+        except NotFoundError:
+            logger.warning(f"Collection '{self.collection_name}' was recreated, refreshing handle.")
+            self.collection = None
+            collection = await self._get_collection()
+            return await getattr(collection, method)(**kwargs)
+
     async def create_collection(self, collection_name, metadata, config):
 
         logger.info("Ensuring chroma collection exists.")
-        await self.client.get_or_create_collection(name=collection_name,
-                                                   metadata=metadata,
-                                                   configuration=config)
+        collection = await self.client.get_or_create_collection(name=collection_name,
+                                                                metadata=metadata,
+                                                                configuration=config)
+        if collection_name == self.collection_name:
+            self.collection = collection
 
         return True
 
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def add(self, items):
 
-        collection = await self.client.get_collection(name=self.collection_name)
         serialized_items = serialize_items(items)
 
-        await collection.add(
+        await self._call(
+            "add",
             ids=serialized_items["ids"],
             documents=serialized_items["documents"],
             embeddings=serialized_items["embeddings"],
@@ -80,9 +104,7 @@ class ChromaDBAdapter(VectorDBAdapter):
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def get_by_ids(self, ids):
 
-        collection = await self.client.get_collection(name=self.collection_name)
-
-        results = await collection.get(ids=ids)
+        results = await self._call("get", ids=ids)
 
         return QueryResponse(
             ids=[results.get("ids", [])],
@@ -93,10 +115,10 @@ class ChromaDBAdapter(VectorDBAdapter):
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def query_by_filter(self, filters, limit):
 
-        collection = await self.client.get_collection(name=self.collection_name)
         where_clause = self._format_filters(filters)
 
-        results = await collection.get(
+        results = await self._call(
+            "get",
             where=where_clause if where_clause else None,
             limit=limit
         )
@@ -114,10 +136,10 @@ class ChromaDBAdapter(VectorDBAdapter):
                                   filters=None,
                                   top_k=20):
 
-        collection = await self.client.get_collection(name=self.collection_name)
         where_clause = self._format_filters(filters)
 
-        results = await collection.query(
+        results = await self._call(
+            "query",
             query_embeddings=query_embeddings,
             n_results=top_k,
             where=where_clause if where_clause else None
@@ -127,33 +149,54 @@ class ChromaDBAdapter(VectorDBAdapter):
             ids=results.get("ids", []),
             documents=results.get("documents", []),
             metadatas=results.get("metadatas", []),
-            distances=results.get("distances", [])
+            # Chroma returns cosine distance (1 - x), the service expects similarity
+            distances=to_similarities(results.get("distances") or [])
         )
 
+    async def _existing_ids(self, ids: List[str]) -> set:
+        """Ids present in the collection, fetched without documents or embeddings"""
+        result = await self._call("get", ids=ids, include=[])
+        return set(result.get("ids", []))
+
+    async def _update_existing(self, ids, documents, embeddings, metadatas) -> List[str]:
+        """Chroma silently skips unknown ids, so the existing ones are looked up first"""
+        existing = await self._existing_ids(ids)
+        keep = [i for i, fact_id in enumerate(ids) if fact_id in existing]
+        if keep:
+            await self._call(
+                "update",
+                ids=[ids[i] for i in keep],
+                documents=[documents[i] for i in keep],
+                embeddings=[embeddings[i] for i in keep],
+                metadatas=[metadatas[i] for i in keep]
+            )
+        return [ids[i] for i in keep]
+
+    async def _delete_existing(self, fact_ids: List[str]) -> List[str]:
+        """Deletes the ids that exist and returns them"""
+        existing = await self._existing_ids(fact_ids)
+        deleted_ids = [fact_id for fact_id in fact_ids if fact_id in existing]
+        if deleted_ids:
+            await self._call("delete", ids=deleted_ids)
+        return deleted_ids
+
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def update(self, items):
 
-        collection = await self.client.get_collection(name=self.collection_name)
-        ids_to_update = [item.id for item in items]
-        documents = [item.document for item in items]
-        embeddings = [item.embedding for item in items]
-        metadatas = [{"updated_at": item.updated_at} for item in items]
-
-        await collection.update(
-            ids=ids_to_update,
-            documents=documents,
-            embeddings=embeddings,
-            metadatas=metadatas
+        updated_ids = await self._update_existing(
+            ids=[item.id for item in items],
+            documents=[item.document for item in items],
+            embeddings=[item.embedding for item in items],
+            metadatas=[{"updated_at": item.updated_at} for item in items]
         )
 
-        logger.info(f"Successfully updated {len(items)} items to chroma collection.")
-        return ids_to_update
+        logger.info(f"Successfully updated {len(updated_ids)} items to chroma collection.")
+        return updated_ids
 
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def delete(self, fact_ids):
 
-        collection = await self.client.get_collection(name=self.collection_name)
-        await collection.delete(ids=fact_ids)
+        deleted_ids = await self._delete_existing(fact_ids)
 
-        logger.info(f"Successfully deleted memory with id {fact_ids} from chroma collection")
-        return fact_ids
+        logger.info(f"Successfully deleted memory with id {deleted_ids} from chroma collection")
+        return deleted_ids
@@ -1,11 +1,13 @@
 """Chroma db implementation using local/persistent db setup"""
 # pylint: disable=too-many-positional-arguments, signature-differs
-from typing import Dict, Any
+from typing import Dict, Any, List
 import chromadb
+from chromadb.errors import NotFoundError
 
 from memsrv.db.base_adapter import VectorDBAdapter
+from memsrv.db.executor import BlockingDBExecutor
 from memsrv.models.response import QueryResponse
-from memsrv.db.utils import serialize_items
+from memsrv.db.utils import serialize_items, to_similarities
 
 from memsrv.utils.logger import get_logger
 from memsrv.telemetry.tracing import traced_span
@@ -13,21 +15,37 @@ from memsrv.telemetry.constants import CustomSpanKinds
 
 logger = get_logger(__name__)
 
+# DB_PROVIDER_CONFIG keys used by the adapter, the rest is chroma collection config
+ADAPTER_CONFIG_KEYS = ("max_workers",)
+
 class ChromaLiteDBAdapter(VectorDBAdapter):
     """Implements vector db ops for chroma DB using persistent dir"""
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.client = chromadb.PersistentClient(path=self.persist_dir)
+        # Resolved once in setup_database, refreshed if the collection is recreated
+        self.collection = None
+        # PersistentClient is blocking (HNSW queries, SQLite writes), keep it off the event loop
+        self.executor = BlockingDBExecutor(
+            name="chroma_lite",
+            max_workers=int(self.provider_config.get("max_workers", 4))
+        )
+
+    async def close(self):
+        """Waits for in-flight client calls and stops the executor"""
+        self.executor.shutdown()
 
     async def setup_database(self):
 
-        # TODO: Chrom returns 1-x value, we need x for similarity
         await self.create_collection(
             collection_name=self.collection_name,
             metadata={
                 "description": self.description
             },
-            config=self.provider_config or {"hnsw": {"space": "cosine"}}
+            config={
+                key: value for key, value in self.provider_config.items()
+                if key not in ADAPTER_CONFIG_KEYS
+            } or {"hnsw": {"space": "cosine"}}
         )
         return self
 
@@ -49,22 +67,46 @@ class ChromaLiteDBAdapter(VectorDBAdapter):
 
         return filters
 
+    def _get_collection(self):
+        """Returns the cached collection handle, resolving it if needed"""
+        if self.collection is None:
+            self.collection = self.client.get_collection(name=self.collection_name)
+        return self.collection
+
+    def _call(self, method: str, **kwargs):
+        """
+        Runs a collection method on the cached handle. A recreated collection
+        gets a new id, so the handle is resolved again and the call retried once.
+        """
+        collection = self._get_collection()
+        try:
+            return getattr(collection, method)(**kwargs)
+        except NotFoundError:
+            logger.warning(f"Collection '{self.collection_name}' was recreated, refreshing handle.")
+            self.collection = None
+            collection = self._get_collection()
+            return getattr(collection, method)(**kwargs)
+
     async def create_collection(self, collection_name, metadata, config):
 
         logger.info("Ensuring chroma collection exists.")
-        self.client.get_or_create_collection(name=collection_name,
-                                             metadata=metadata,
-                                             configuration=config)
+        collection = await self.executor.write(self.client.get_or_create_collection,
+                                               name=collection_name,
+                                               metadata=metadata,
+                                               configuration=config)
+        if collection_name == self.collection_name:
+            self.collection = collection
 
         return True
 
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def add(self, items):
 
-        collection = self.client.get_collection(name=self.collection_name)
         serialized_items = serialize_items(items)
 
-        collection.add(
+        await self.executor.write(
+            self._call,
+            "add",
             ids=serialized_items["ids"],
             documents=serialized_items["documents"],
             embeddings=serialized_items["embeddings"],
@@ -77,9 +119,7 @@ class ChromaLiteDBAdapter(VectorDBAdapter):
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def get_by_ids(self, ids):
 
-        collection = self.client.get_collection(name=self.collection_name)
-
-        results = collection.get(ids=ids)
+        results = await self.executor.read(self._call, "get", ids=ids)
 
         return QueryResponse(
             ids=[results.get("ids", [])],
@@ -90,10 +130,11 @@ class ChromaLiteDBAdapter(VectorDBAdapter):
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def query_by_filter(self, filters, limit):
 
-        collection = self.client.get_collection(name=self.collection_name)
         where_clause = self._format_filters(filters)
 
-        results = collection.get(
+        results = await self.executor.read(
+            self._call,
+            "get",
             where=where_clause if where_clause else None,
             limit=limit
         )
@@ -111,10 +152,11 @@ class ChromaLiteDBAdapter(VectorDBAdapter):
                                   filters=None,
                                   top_k=20):
 
-        collection = self.client.get_collection(name=self.collection_name)
         where_clause = self._format_filters(filters)
 
-        results = collection.query(
+        results = await self.executor.read(
+            self._call,
+            "query",
             query_embeddings=query_embeddings,
             n_results=top_k,
             where=where_clause if where_clause else None
@@ -124,33 +166,56 @@ class ChromaLiteDBAdapter(VectorDBAdapter):
             ids=results.get("ids", []),
             documents=results.get("documents", []),
             metadatas=results.get("metadatas", []),
-            distances=results.get("distances", [])
+            # Chroma returns cosine distance (1 - x), the service expects similarity
+            distances=to_similarities(results.get("distances") or [])
         )
 
+    def _existing_ids(self, ids: List[str]) -> set:
+        """Ids present in the collection, fetched without documents or embeddings"""
+        result = self._call("get", ids=ids, include=[])
+        return set(result.get("ids", []))
+
+    def _update_existing(self, ids, documents, embeddings, metadatas) -> List[str]:
+        """Chroma silently skips unknown ids, so the existing ones are looked up first"""
+        existing = self._existing_ids(ids)
+        keep = [i for i, fact_id in enumerate(ids) if fact_id in existing]
+        if keep:
+            self._call(
+                "update",
+                ids=[ids[i] for i in keep],
+                documents=[documents[i] for i in keep],
+                embeddings=[embeddings[i] for i in keep],
+                metadatas=[metadatas[i] for i in keep]
+            )
+        return [ids[i] for i in keep]
+
+    def _delete_existing(self, fact_ids: List[str]) -> List[str]:
+        """Deletes the ids that exist and returns them"""
+        existing = self._existing_ids(fact_ids)
+        deleted_ids = [fact_id for fact_id in fact_ids if fact_id in existing]
+        if deleted_ids:
+            self._call("delete", ids=deleted_ids)
+        return deleted_ids
+
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def update(self, items):
 
-        collection = self.client.get_collection(name=self.collection_name)
-        ids_to_update = [item.id for item in items]
-        documents = [item.document for item in items]
-        embeddings = [item.embedding for item in items]
-        metadatas = [{"updated_at": item.updated_at} for item in items]
-
-        collection.update(
-            ids=ids_to_update,
-            documents=documents,
-            embeddings=embeddings,
-            metadatas=metadatas
+        # Lookup and update run as one job, so no other write interleaves
+        updated_ids = await self.executor.write(
+            self._update_existing,
+            ids=[item.id for item in items],
+            documents=[item.document for item in items],
+            embeddings=[item.embedding for item in items],
+            metadatas=[{"updated_at": item.updated_at} for item in items]
         )
 
-        logger.info(f"Successfully updated {len(items)} items to chroma collection.")
-        return ids_to_update
+        logger.info(f"Successfully updated {len(updated_ids)} items to chroma collection.")
+        return updated_ids
 
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def delete(self, fact_ids):
 
-        collection = self.client.get_collection(name=self.collection_name)
-        collection.delete(ids=fact_ids)
+        deleted_ids = await self.executor.write(self._delete_existing, fact_ids)
 
-        logger.info(f"Successfully deleted memory with id {fact_ids} from chroma collection")
-        return fact_ids
+        logger.info(f"Successfully deleted memory with id {deleted_ids} from chroma collection")
+        return deleted_ids
@@ -0,0 +1,549 @@
+"""Embedded HNSW index with SQLite for documents and metadata"""
+# pylint: disable=too-many-positional-arguments, signature-differs, too-many-instance-attributes, too-many-locals, line-too-long
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from memsrv.db.base_adapter import VectorDBAdapter
+from memsrv.db.executor import BlockingDBExecutor
+from memsrv.models.response import QueryResponse
+from memsrv.db.utils import serialize_items, ReadWriteLock
+
+from memsrv.utils.logger import get_logger
+from memsrv.utils.exceptions import ConfigurationError
+from memsrv.telemetry.tracing import traced_span
+from memsrv.telemetry.constants import CustomSpanKinds
+
+logger = get_logger(__name__)
+
+FILTER_FIELDS = ("user_id", "app_id", "session_id", "agent_name")
+METADATA_FIELDS = FILTER_FIELDS + ("event_timestamp", "created_at", "updated_at")
+ROW_COLUMNS = ("id", "document") + METADATA_FIELDS
+
+class HnswStore:
+    """
+    SQLite holds documents, metadata and the float32 vectors and is the source
+    of truth. Every write also appends (label, op) to a `wal` table in the same
+    transaction. The HNSW graph is snapshotted to disk every `snapshot_every`
+    changes, on startup the last snapshot is loaded and newer wal entries are
+    replayed, so the graph is never rebuilt from scratch.
+    Label sets per filter value are kept in memory for pre-filtered search.
+    Writers hold `_lock` (SQLite and label sets) for the whole write and the
+    graph write lock only while mutating it, graph searches run concurrently.
+    """
+    def __init__(self,
+                 path: str,
+                 dims: int,
+                 settings: Dict[str, Any]):
+        try:
+            import hnswlib # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ConfigurationError(
+                "hnswlib is required for the hnsw_lite adapter, "
+                "install it with `uv sync --group embedded-hnsw`."
+            ) from e
+
+        os.makedirs(path, exist_ok=True)
+        self.dims = dims
+        self.settings = settings
+        self._index_path = os.path.join(path, "index.bin")
+        self._meta_path = os.path.join(path, "index.json")
+        self._lock = threading.RLock()
+        self._graph_lock = ReadWriteLock()
+        self._changes_since_snapshot = 0
+
+        self._conn = sqlite3.connect(os.path.join(path, "memories.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS memories (
+                label INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT UNIQUE NOT NULL,
+                document TEXT,
+                user_id TEXT,
+                app_id TEXT,
+                session_id TEXT,
+                agent_name TEXT,
+                event_timestamp TEXT,
+                created_at TEXT,
+                updated_at TEXT,
+                embedding BLOB
+            );
+            CREATE INDEX IF NOT EXISTS memories_user_app_updated_idx
+                ON memories (user_id, app_id, updated_at DESC);
+            CREATE TABLE IF NOT EXISTS wal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                label INTEGER NOT NULL,
+                op TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+        self.index = hnswlib.Index(space="cosine", dim=dims) # pylint: disable=c-extension-no-member
+        snapshot_seq = self._load_snapshot()
+        self._replay_wal(snapshot_seq)
+        self._load_label_sets()
+
+    def _load_snapshot(self) -> int:
+        """Loads the last graph snapshot, returns the wal seq it includes"""
+        if os.path.exists(self._meta_path) and os.path.exists(self._index_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.index.load_index(self._index_path, max_elements=meta["max_elements"],
+                                  allow_replace_deleted=True)
+            self.index.set_ef(self.settings["ef_search"])
+            logger.info(f"Loaded HNSW snapshot at wal seq {meta['seq']}.")
+            return meta["seq"]
+
+        self.index.init_index(max_elements=self.settings["initial_capacity"],
+                              ef_construction=self.settings["ef_construction"],
+                              M=self.settings["m"],
+                              allow_replace_deleted=True)
+        self.index.set_ef(self.settings["ef_search"])
+        return 0
+
+    def _replay_wal(self, snapshot_seq: int):
+        """Applies the changes written after the snapshot, entries are idempotent"""
+        rows = self._conn.execute(
+            "SELECT w.seq, w.label, w.op, m.embedding FROM wal w "
+            "LEFT JOIN memories m ON m.label = w.label WHERE w.seq > ? ORDER BY w.seq",
+            (snapshot_seq,)
+        ).fetchall()
+        for _, label, op, blob in rows:
+            if op == "put" and blob is not None:
+                self._index_vectors(np.frombuffer(blob, dtype=np.float32).reshape(1, -1), [label])
+            elif op == "delete":
+                self._unindex([label])
+        self._changes_since_snapshot = len(rows)
+        if rows:
+            logger.info(f"Replayed {len(rows)} wal entries after seq {snapshot_seq}.")
+
+    def _load_label_sets(self):
+        """Builds label sets per filter value from SQLite"""
+        self.label_sets: Dict[str, Dict[str, set]] = {field: {} for field in FILTER_FIELDS}
+        self.id_to_label: Dict[str, int] = {}
+        self.labels: set = set()
+        rows = self._conn.execute(f"SELECT label, id, {', '.join(FILTER_FIELDS)} FROM memories").fetchall()
+        for label, fact_id, *values in rows:
+            self._add_labels(label, fact_id, dict(zip(FILTER_FIELDS, values)))
+
+    def _add_labels(self, label: int, fact_id: str, values: Dict[str, Any]):
+        """Adds a label to the sets of its filter values"""
+        self.id_to_label[fact_id] = label
+        self.labels.add(label)
+        for field in FILTER_FIELDS:
+            self.label_sets[field].setdefault(values[field], set()).add(label)
+
+    def _remove_labels(self, label: int, fact_id: str, values: Dict[str, Any]):
+        """Removes a label from the sets of its filter values"""
+        self.id_to_label.pop(fact_id, None)
+        self.labels.discard(label)
+        for field in FILTER_FIELDS:
+            labels = self.label_sets[field].get(values[field])
+            if labels is not None:
+                labels.discard(label)
+
+    def _index_vectors(self, vectors: np.ndarray, labels: List[int]):
+        """Adds or replaces vectors in the graph, growing it if needed"""
+        with self._graph_lock.write():
+            needed = self.index.get_current_count() + len(labels)
+            if needed > self.index.get_max_elements():
+                self.index.resize_index(max(self.index.get_max_elements() * 2, needed))
+            self.index.add_items(vectors, labels, replace_deleted=True)
+
+    def _unindex(self, labels: List[int]):
+        """Marks labels deleted, their slots are reused by later inserts"""
+        with self._graph_lock.write():
+            for label in labels:
+                try:
+                    self.index.mark_deleted(label)
+                except RuntimeError:
+                    # Already deleted, or never indexed in this snapshot
+                    pass
+
+    @contextmanager
+    def _transaction(self):
+        """Commits the SQLite changes, rolls back and raises ValueError on failure"""
+        try:
+            yield
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self._conn.rollback()
+            logger.error(f"An unexpected database error occurred: {e}")
+            raise ValueError(e) from e
+
+    def _log_changes(self, changes: List[Tuple[int, str]]):
+        """Appends to the wal and snapshots the graph once enough changes piled up"""
+        self._conn.executemany("INSERT INTO wal (label, op) VALUES (?, ?)", changes)
+        self._changes_since_snapshot += len(changes)
+
+    def _maybe_snapshot(self):
+        """Snapshots the graph every `snapshot_every` changes"""
+        if self._changes_since_snapshot >= self.settings["snapshot_every"]:
+            self.snapshot()
+
+    def snapshot(self):
+        """Persists the graph and truncates the wal entries it covers"""
+        with self._lock:
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM wal").fetchone()[0]
+            with self._graph_lock.read():
+                self.index.save_index(self._index_path + ".tmp")
+            os.replace(self._index_path + ".tmp", self._index_path)
+            # Meta is written last, a crash in between only replays a few extra entries
+            with open(self._meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "max_elements": self.index.get_max_elements()}, f)
+            os.replace(self._meta_path + ".tmp", self._meta_path)
+            self._conn.execute("DELETE FROM wal WHERE seq <= ?", (seq,))
+            self._conn.commit()
+            self._changes_since_snapshot = 0
+        logger.info(f"Saved HNSW snapshot at wal seq {seq}.")
+
+    def upsert(self, records: List[Dict[str, Any]], vectors: List[List[float]]) -> List[str]:
+        """Adds records, replacing the ones with an existing id"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            labels, new_records = [], {}
+            with self._transaction():
+                for record, vector in zip(records, matrix):
+                    previous = self._conn.execute(
+                        "SELECT label FROM memories WHERE id = ?", (record["id"],)
+                    ).fetchone()
+                    # Like the other adapters an upsert keeps the metadata of an existing row
+                    label = self._conn.execute(
+                        f"INSERT INTO memories ({', '.join(ROW_COLUMNS)}, embedding) "
+                        f"VALUES ({', '.join('?' for _ in ROW_COLUMNS)}, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET document = excluded.document, "
+                        "embedding = excluded.embedding, updated_at = excluded.updated_at "
+                        "RETURNING label",
+                        [record.get(column) for column in ROW_COLUMNS] + [vector.tobytes()]
+                    ).fetchone()[0]
+                    if previous is None:
+                        new_records[label] = record
+                    labels.append(label)
+                self._log_changes([(label, "put") for label in labels])
+
+            self._index_vectors(matrix, labels)
+            for label, record in new_records.items():
+                self._add_labels(label, record["id"], record)
+            self._maybe_snapshot()
+        return [record["id"] for record in records]
+
+    def update(self, updates: List[Dict[str, Any]], vectors: List[List[float]]) -> List[str]:
+        """Replaces document, vector and updated_at of existing rows"""
+        with self._lock:
+            updated_ids, labels, kept_vectors = [], [], []
+            with self._transaction():
+                for update, vector in zip(updates, vectors):
+                    label = self.id_to_label.get(update["id"])
+                    if label is None:
+                        continue
+                    blob = np.asarray(vector, dtype=np.float32)
+                    self._conn.execute(
+                        "UPDATE memories SET document = ?, embedding = ?, updated_at = ? WHERE label = ?",
+                        (update["document"], blob.tobytes(), update["updated_at"], label)
+                    )
+                    updated_ids.append(update["id"])
+                    labels.append(label)
+                    kept_vectors.append(blob)
+                self._log_changes([(label, "put") for label in labels])
+
+            if labels:
+                self._index_vectors(np.vstack(kept_vectors), labels)
+                self._maybe_snapshot()
+        return updated_ids
+
+    def delete(self, ids: List[str]) -> List[str]:
+        """Removes the rows for the given ids"""
+        if not ids:
+            return []
+        placeholders = ", ".join("?" for _ in ids)
+        with self._lock:
+            with self._transaction():
+                rows = self._conn.execute(
+                    f"SELECT label, id, {', '.join(FILTER_FIELDS)} FROM memories WHERE id IN ({placeholders})", ids
+                ).fetchall()
+                labels = [row[0] for row in rows]
+                self._conn.executemany("DELETE FROM memories WHERE label = ?", [(label,) for label in labels])
+                self._log_changes([(label, "delete") for label in labels])
+
+            self._unindex(labels)
+            for label, fact_id, *values in rows:
+                self._remove_labels(label, fact_id, dict(zip(FILTER_FIELDS, values)))
+            self._maybe_snapshot()
+        return [row[1] for row in rows]
+
+    def fetch(self,
+              where_sql: str = "",
+              params: Optional[list] = None,
+              suffix_sql: str = "") -> Dict[Any, Dict[str, Any]]:
+        """Runs a SELECT over the memories table, returns records keyed by label"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT label, {', '.join(ROW_COLUMNS)} FROM memories {where_sql} {suffix_sql}",
+                params or []
+            ).fetchall()
+        return {row[0]: dict(zip(ROW_COLUMNS, row[1:])) for row in rows}
+
+    def get_by_labels(self, labels: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Records for the given labels"""
+        if not labels:
+            return {}
+        placeholders = ", ".join("?" for _ in labels)
+        return self.fetch(f"WHERE label IN ({placeholders})", labels)
+
+    def candidate_labels(self, filters: Dict[str, Any]) -> set:
+        """Labels matching all the equality filters, smallest set first"""
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported filter fields {sorted(unknown)}, use {FILTER_FIELDS}.")
+        with self._lock:
+            sets = sorted(
+                (self.label_sets[field].get(value, set()) for field, value in filters.items()),
+                key=len
+            )
+            candidates = set(sets[0])
+            for labels in sets[1:]:
+                candidates &= labels
+        return candidates
+
+    def search(self,
+               query_vectors: List[List[float]],
+               filters: Optional[Dict[str, Any]],
+               top_k: int) -> List[List[Tuple[int, float]]]:
+        """Top-k per query as (label, similarity)"""
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if filters:
+            candidates = self.candidate_labels(filters)
+            if len(candidates) <= self.settings["brute_force_max_rows"]:
+                return self._brute_force(queries, candidates, top_k)
+            matches = self._knn(queries, min(top_k, len(candidates)), candidates.__contains__)
+        else:
+            candidates = None
+            matches = self._knn(queries, min(top_k, len(self.labels)), None) if self.labels else None
+
+        if matches is None:
+            # Graph walk couldn't reach k live (or matching) nodes
+            return self._brute_force(queries, candidates, top_k)
+        return matches
+
+    def _knn(self, queries: np.ndarray, k: int, label_filter) -> Optional[List[List[Tuple[int, float]]]]:
+        """Graph search, None if the (filtered) graph walk can't find k results"""
+        try:
+            with self._graph_lock.read():
+                labels, distances = self.index.knn_query(queries, k=k, filter=label_filter)
+        except RuntimeError:
+            return None
+        return [
+            [(int(label), 1 - float(distance)) for label, distance in zip(row_labels, row_distances)]
+            for row_labels, row_distances in zip(labels, distances)
+        ]
+
+    def _brute_force(self,
+                     queries: np.ndarray,
+                     candidates: Optional[set],
+                     top_k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Exact scan over the candidates, cheaper than a filtered graph walk for
+        small candidate sets. Vectors are read from SQLite, hnswlib's get_items
+        copies through python lists and is several times slower.
+        """
+        with self._lock:
+            if candidates is None:
+                rows = self._conn.execute("SELECT label, embedding FROM memories").fetchall()
+            elif candidates:
+                placeholders = ", ".join("?" for _ in candidates)
+                rows = self._conn.execute(
+                    f"SELECT label, embedding FROM memories WHERE label IN ({placeholders})", list(candidates)
+                ).fetchall()
+            else:
+                rows = []
+        if not rows:
+            return [[] for _ in range(queries.shape[0])]
+
+        labels = [row[0] for row in rows]
+        vectors = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+        vector_norms = np.linalg.norm(vectors, axis=1)
+        query_norms = np.linalg.norm(queries, axis=1)
+        scores = (vectors @ queries.T) / np.outer(
+            np.where(vector_norms == 0, 1, vector_norms), np.where(query_norms == 0, 1, query_norms)
+        )
+        k = min(top_k, len(labels))
+        results = []
+        for query_index in range(queries.shape[0]):
+            column = scores[:, query_index]
+            top = np.argpartition(-column, k - 1)[:k] if k < len(labels) else np.arange(len(labels))
+            top = top[np.argsort(-column[top])]
+            results.append([(labels[i], float(column[i])) for i in top])
+        return results
+
+    def close(self):
+        """Snapshots pending changes and closes SQLite"""
+        if self._changes_since_snapshot:
+            self.snapshot()
+        with self._lock:
+            self._conn.close()
+
+class HnswLiteDBAdapter(VectorDBAdapter):
+    """
+    Lightweight single-node adapter, an in-process HNSW graph (hnswlib) next to
+    a SQLite table. Lower RSS and more predictable latency than embedded chroma.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.store: Optional[HnswStore] = None
+        self.settings = self._settings()
+        self.executor = BlockingDBExecutor(name="hnsw_lite", max_workers=self.settings["max_workers"])
+
+    def _settings(self) -> Dict[str, Any]:
+        """
+        Graph and search settings from DB_PROVIDER_CONFIG, e.g.
+        {"m": 16, "ef_construction": 200, "ef_search": 64, "brute_force_max_rows": 2000}
+        """
+        config = self.provider_config
+        return {
+            "m": int(config.get("m", 16)),
+            "ef_construction": int(config.get("ef_construction", 200)),
+            "ef_search": int(config.get("ef_search", 64)),
+            "initial_capacity": int(config.get("initial_capacity", 1024)),
+            # Filtered searches over at most this many rows skip the graph
+            "brute_force_max_rows": int(config.get("brute_force_max_rows", 2000)),
+            # Graph snapshot every n changes, newer changes are replayed from the wal
+            "snapshot_every": int(config.get("snapshot_every", 1000)),
+            "max_workers": int(config.get("max_workers", 4)),
+        }
+
+    async def close(self):
+        """Waits for in-flight calls, then snapshots and closes the store"""
+        self.executor.shutdown()
+        if self.store is not None:
+            self.store.close()
+
+    async def setup_database(self):
+        await self.create_collection(collection_name=self.collection_name)
+        return self
+
+    async def create_collection(self, collection_name, metadata=None, config=None):
+        """Opens (or creates) the collection dir under the persist dir"""
+        path = os.path.join(self.persist_dir, f"{collection_name}_hnsw")
+        logger.info(f"Opening hnsw collection at '{path}'.")
+        self.store = await self.executor.write(
+            HnswStore, path=path, dims=int(self.embedding_dim), settings=self.settings
+        )
+        return True
+
+    @staticmethod
+    def _split(records: List[Dict[str, Any]]) -> Tuple[list, list, list]:
+        """Splits the records into ids, documents and metadatas"""
+        return (
+            [record["id"] for record in records],
+            [record["document"] for record in records],
+            [{field: record[field] for field in METADATA_FIELDS} for record in records]
+        )
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def add(self, items):
+
+        serialized_items = serialize_items(items)
+        records = [
+            {"id": item_id, "document": document, **metadata}
+            for item_id, document, metadata in zip(
+                serialized_items["ids"], serialized_items["documents"], serialized_items["metadatas"]
+            )
+        ]
+        await self.executor.write(self.store.upsert, records, serialized_items["embeddings"])
+
+        logger.info(f"Successfully added {len(items)} items to hnsw collection.")
+        return serialized_items["ids"]
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def get_by_ids(self, ids):
+
+        placeholders = ", ".join("?" for _ in ids)
+        records = await self.executor.read(self.store.fetch, f"WHERE id IN ({placeholders})", ids) if ids else {}
+        result_ids, documents, metadatas = self._split(list(records.values()))
+
+        return QueryResponse(
+            ids=[result_ids],
+            documents=[documents],
+            metadatas=[metadatas]
+        )
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def query_by_filter(self, filters, limit):
+
+        filters = filters or {}
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported filter fields {sorted(unknown)}, use {FILTER_FIELDS}.")
+        where_sql = " AND ".join(f"{field} = ?" for field in filters)
+        records = await self.executor.read(
+            self.store.fetch,
+            f"WHERE {where_sql}" if where_sql else "",
+            list(filters.values()) + [limit],
+            "ORDER BY updated_at DESC LIMIT ?"
+        )
+        ids, documents, metadatas = self._split(list(records.values()))
+
+        return QueryResponse(
+            ids=[ids],
+            documents=[documents],
+            metadatas=[metadatas]
+        )
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def query_by_similarity(self,
+                                  query_embeddings,
+                                  query_texts=None,
+                                  filters=None,
+                                  top_k=20):
+
+        matches = await self.executor.read(self.store.search, query_embeddings, filters, top_k)
+        records = await self.executor.read(
+            self.store.get_by_labels, list({label for query in matches for label, _ in query})
+        )
+
+        ids, documents, metadatas, similarities = [], [], [], []
+        for query_matches in matches:
+            # A row deleted between the two reads is dropped
+            found = [(label, score) for label, score in query_matches if label in records]
+            query_ids, query_documents, query_metadatas = self._split([records[label] for label, _ in found])
+            ids.append(query_ids)
+            documents.append(query_documents)
+            metadatas.append(query_metadatas)
+            similarities.append([score for _, score in found])
+
+        return QueryResponse(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            distances=similarities
+        )
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def update(self, items):
+
+        updates = [
+            {"id": item.id, "document": item.document, "updated_at": item.updated_at}
+            for item in items
+        ]
+        updated_ids = await self.executor.write(
+            self.store.update, updates, [item.embedding for item in items]
+        )
+
+        logger.info(f"Successfully updated {len(updated_ids)} items in hnsw collection.")
+        return updated_ids
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def delete(self, fact_ids):
+
+        deleted_ids = await self.executor.write(self.store.delete, fact_ids)
+
+        logger.info(f"Successfully deleted memory with id {deleted_ids} from hnsw collection")
+        return deleted_ids
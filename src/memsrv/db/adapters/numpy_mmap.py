@@ -0,0 +1,406 @@
+"""In-process exact search over a memory-mapped float32 matrix"""
+# pylint: disable=too-many-positional-arguments, signature-differs, too-many-instance-attributes
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from memsrv.db.base_adapter import VectorDBAdapter
+from memsrv.db.executor import BlockingDBExecutor
+from memsrv.models.response import QueryResponse
+from memsrv.db.utils import serialize_items, ReadWriteLock
+
+from memsrv.utils.logger import get_logger
+from memsrv.telemetry.tracing import traced_span
+from memsrv.telemetry.constants import CustomSpanKinds
+
+logger = get_logger(__name__)
+
+# Metadata columns, the first four can be used as filters
+FILTER_FIELDS = ("user_id", "app_id", "session_id", "agent_name")
+METADATA_FIELDS = FILTER_FIELDS + ("event_timestamp", "created_at", "updated_at")
+
+class MemmapVectorStore:
+    """
+    Embeddings live in one contiguous (capacity, dims) float32 matrix mapped from
+    `vectors.f32`, so startup is an mmap plus a replay of the row log.
+    Metadata is columnar: python lists per field, int32 codes per filter field
+    and a row-id posting list per user_id, so filters are numpy masks.
+    Writers hold the exclusive side of `_lock` for the whole change and readers
+    the shared side, returning copies of the records, so concurrent readers never
+    see a half written row or a row slot reused for another id.
+    """
+    def __init__(self, path: str, dims: int, initial_capacity: int = 1024):
+        os.makedirs(path, exist_ok=True)
+        self.dims = dims
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._log_path = os.path.join(path, "rows.jsonl")
+        self._lock = ReadWriteLock()
+
+        self.capacity = 0
+        self.size = 0
+        self.matrix: Optional[np.memmap] = None
+        self.alive = np.zeros(0, dtype=bool)
+        self.codes = {field: np.zeros(0, dtype=np.int32) for field in FILTER_FIELDS}
+        self.vocab: Dict[str, Dict[str, int]] = {field: {} for field in FILTER_FIELDS}
+        self.columns: Dict[str, List[Optional[str]]] = {
+            field: [] for field in ("id", "document") + METADATA_FIELDS
+        }
+        self.id_to_row: Dict[str, int] = {}
+        self.user_rows: Dict[str, set] = {}
+        self._free_rows: List[int] = []
+        self._log_lines = 0
+
+        existing_rows = 0
+        if os.path.exists(self._vectors_path):
+            existing_rows = os.path.getsize(self._vectors_path) // (4 * dims)
+        self._grow(max(existing_rows, initial_capacity))
+        self._replay()
+        self._log = open(self._log_path, "a", encoding="utf-8") # pylint: disable=consider-using-with
+
+    def _grow(self, capacity: int):
+        """Extends the vectors file and the column arrays to hold `capacity` rows"""
+        if self.matrix is not None:
+            self.matrix.flush()
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dims * 4)
+        self.matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                shape=(capacity, self.dims))
+
+        extra = capacity - self.capacity
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+        for field in FILTER_FIELDS:
+            # -1 never matches a vocab code
+            self.codes[field] = np.concatenate([self.codes[field], np.full(extra, -1, dtype=np.int32)])
+        for column in self.columns.values():
+            column.extend([None] * extra)
+        self.capacity = capacity
+
+    def _replay(self):
+        """Rebuilds the columns from the row log, the log is the commit point for rows"""
+        if not os.path.exists(self._log_path):
+            return
+        with open(self._log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._log_lines += 1
+                if entry["op"] == "put":
+                    self._set_row(entry["row"], entry["record"])
+                else:
+                    self._clear_row(entry["row"])
+        self.size = max(self.id_to_row.values(), default=-1) + 1
+        self._free_rows = [row for row in range(self.size) if not self.alive[row]]
+        logger.info(f"Loaded {len(self.id_to_row)} rows from {self._log_path}.")
+
+    def _set_row(self, row: int, record: Dict[str, Any]):
+        """Writes the metadata columns of a row and publishes it"""
+        previous_id = self.columns["id"][row]
+        if previous_id is not None and self.alive[row]:
+            self._clear_row(row)
+        for field, column in self.columns.items():
+            column[row] = record.get(field)
+        for field in FILTER_FIELDS:
+            vocab = self.vocab[field]
+            self.codes[field][row] = vocab.setdefault(record[field], len(vocab))
+        self.id_to_row[record["id"]] = row
+        self.user_rows.setdefault(record["user_id"], set()).add(row)
+        self.alive[row] = True
+
+    def _clear_row(self, row: int):
+        """Unpublishes a row, its slot is reused by later writes"""
+        self.alive[row] = False
+        self.id_to_row.pop(self.columns["id"][row], None)
+        rows = self.user_rows.get(self.columns["user_id"][row])
+        if rows is not None:
+            rows.discard(row)
+
+    def _append_log(self, entries: List[Dict[str, Any]]):
+        """Appends the entries to the row log"""
+        self._log.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._log.flush()
+        self._log_lines += len(entries)
+
+    def _maybe_compact_log(self):
+        """Rewrites the log with one put per live row once it is mostly stale"""
+        if self._log_lines <= max(2 * len(self.id_to_row), 1000):
+            return
+        tmp_path = self._log_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for row in self.id_to_row.values():
+                f.write(json.dumps({"op": "put", "row": row, "record": self.get_record(row)}) + "\n")
+        self._log.close()
+        os.replace(tmp_path, self._log_path)
+        self._log = open(self._log_path, "a", encoding="utf-8") # pylint: disable=consider-using-with
+        self._log_lines = len(self.id_to_row)
+
+    @staticmethod
+    def _normalize(vectors: List[List[float]]) -> np.ndarray:
+        """Unit length rows, so the dot product is the cosine similarity"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def get_record(self, row: int) -> Dict[str, Any]:
+        """Returns id, document and metadata for a row"""
+        return {field: column[row] for field, column in self.columns.items()}
+
+    def get_records(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Records of the given ids that exist, in the order asked"""
+        with self._lock.read():
+            rows = (self.id_to_row.get(fact_id) for fact_id in ids)
+            return [self.get_record(row) for row in rows if row is not None]
+
+    def filter_records(self, filters: Optional[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        """Records matching the filters, most recently updated first"""
+        with self._lock.read():
+            rows = self._filter_rows(filters).tolist()
+            updated_at = self.columns["updated_at"]
+            # ISO timestamps in UTC sort lexicographically
+            rows = sorted(rows, key=lambda row: updated_at[row] or "", reverse=True)[:limit]
+            return [self.get_record(row) for row in rows]
+
+    def upsert(self, records: List[Dict[str, Any]], vectors: List[List[float]]) -> List[str]:
+        """Adds records, replacing the ones with an existing id"""
+        normalized = self._normalize(vectors)
+        with self._lock.write():
+            return self._upsert(records, normalized)
+
+    def _upsert(self, records: List[Dict[str, Any]], normalized: np.ndarray) -> List[str]:
+        """upsert with the write lock held"""
+        rows, batch_rows = [], {}
+        for record in records:
+            row = self.id_to_row.get(record["id"], batch_rows.get(record["id"]))
+            if row is None:
+                row = self._free_rows.pop() if self._free_rows else self.size
+                self.size = max(self.size, row + 1)
+            batch_rows[record["id"]] = row
+            rows.append(row)
+        if self.size > self.capacity:
+            self._grow(max(self.capacity * 2, self.size))
+
+        for row, vector in zip(rows, normalized):
+            self.matrix[row] = vector
+        self.matrix.flush()
+        self._append_log([
+            {"op": "put", "row": row, "record": record}
+            for row, record in zip(rows, records)
+        ])
+        for row, record in zip(rows, records):
+            self._set_row(row, record)
+        self._maybe_compact_log()
+        return [record["id"] for record in records]
+
+    def update(self, updates: List[Dict[str, Any]], vectors: List[List[float]]) -> List[str]:
+        """Replaces document, vector and updated_at of existing rows"""
+        with self._lock.write():
+            records, kept_vectors = [], []
+            for update, vector in zip(updates, vectors):
+                row = self.id_to_row.get(update["id"])
+                if row is None:
+                    continue
+                records.append({**self.get_record(row), **update})
+                kept_vectors.append(vector)
+            if not records:
+                return []
+            return self._upsert(records, self._normalize(kept_vectors))
+
+    def delete(self, ids: List[str]) -> List[str]:
+        """Removes the rows for the given ids"""
+        with self._lock.write():
+            rows = [(fact_id, self.id_to_row[fact_id]) for fact_id in ids if fact_id in self.id_to_row]
+            self._append_log([{"op": "delete", "row": row} for _, row in rows])
+            for _, row in rows:
+                self._clear_row(row)
+                self._free_rows.append(row)
+            self._maybe_compact_log()
+        return [fact_id for fact_id, _ in rows]
+
+    def _filter_rows(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Row ids matching all the equality filters, called with the lock held"""
+        filters = filters or {}
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported filter fields {sorted(unknown)}, use {FILTER_FIELDS}.")
+
+        alive = self.alive
+        if "user_id" in filters:
+            rows = np.fromiter(self.user_rows.get(filters["user_id"], ()), dtype=np.int64)
+        else:
+            rows = np.flatnonzero(alive[:self.size])
+
+        for field, value in filters.items():
+            if field == "user_id":
+                continue
+            code = self.vocab[field].get(value)
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            rows = rows[self.codes[field][rows] == code]
+        return rows[alive[rows]]
+
+    def search(self,
+               query_vectors: List[List[float]],
+               filters: Optional[Dict[str, Any]],
+               top_k: int) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """Exact cosine top-k records and their similarity per query over the filtered rows"""
+        queries = self._normalize(query_vectors)
+        with self._lock.read():
+            rows = self._filter_rows(filters)
+            if len(rows) == 0:
+                return [[] for _ in query_vectors]
+
+            # (rows, queries) similarities in a single matrix product
+            scores = self.matrix[rows] @ queries.T
+            k = min(top_k, len(rows))
+            results = []
+            for query_index in range(queries.shape[0]):
+                column = scores[:, query_index]
+                if k < len(rows):
+                    top = np.argpartition(-column, k - 1)[:k]
+                else:
+                    top = np.arange(len(rows))
+                top = top[np.argsort(-column[top])]
+                results.append([(self.get_record(int(rows[i])), float(column[i])) for i in top])
+            return results
+
+    def close(self):
+        """Flushes the vectors and closes the log"""
+        with self._lock.write():
+            self.matrix.flush()
+            self._log.close()
+
+class NumpyMmapDBAdapter(VectorDBAdapter):
+    """
+    Embedded exact-search adapter for small and medium collections.
+    A few thousand memories per tenant are scanned faster with one
+    matrix-vector product than through an ANN index or a network hop.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.store: Optional[MemmapVectorStore] = None
+        self.executor = BlockingDBExecutor(
+            name="numpy_mmap",
+            max_workers=int(self.provider_config.get("max_workers", 4))
+        )
+
+    async def close(self):
+        """Waits for in-flight calls, then flushes and closes the store"""
+        self.executor.shutdown()
+        if self.store is not None:
+            self.store.close()
+
+    async def setup_database(self):
+        await self.create_collection(collection_name=self.collection_name)
+        return self
+
+    async def create_collection(self, collection_name, metadata=None, config=None):
+        """Opens (or creates) the collection dir under the persist dir"""
+        path = os.path.join(self.persist_dir, collection_name)
+        logger.info(f"Opening numpy collection at '{path}'.")
+        self.store = await self.executor.write(
+            MemmapVectorStore,
+            path=path,
+            dims=int(self.embedding_dim),
+            initial_capacity=int(self.provider_config.get("initial_capacity", 1024))
+        )
+        return True
+
+    @staticmethod
+    def _to_response(records: List[Dict[str, Any]],
+                     scores: Optional[List[float]] = None) -> Tuple[list, list, list, list]:
+        """Splits the stored records into ids, documents and metadatas"""
+        ids, documents, metadatas = [], [], []
+        for record in records:
+            ids.append(record["id"])
+            documents.append(record["document"])
+            metadatas.append({field: record[field] for field in METADATA_FIELDS})
+        return ids, documents, metadatas, scores or []
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def add(self, items):
+
+        serialized_items = serialize_items(items)
+        records = [
+            {"id": item_id, "document": document, **metadata}
+            for item_id, document, metadata in zip(
+                serialized_items["ids"], serialized_items["documents"], serialized_items["metadatas"]
+            )
+        ]
+        await self.executor.write(self.store.upsert, records, serialized_items["embeddings"])
+
+        logger.info(f"Successfully added {len(items)} items to numpy collection.")
+        return serialized_items["ids"]
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def get_by_ids(self, ids):
+
+        records = await self.executor.read(self.store.get_records, ids)
+        result_ids, documents, metadatas, _ = self._to_response(records)
+
+        return QueryResponse(
+            ids=[result_ids],
+            documents=[documents],
+            metadatas=[metadatas]
+        )
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def query_by_filter(self, filters, limit):
+
+        records = await self.executor.read(self.store.filter_records, filters, limit)
+        ids, documents, metadatas, _ = self._to_response(records)
+
+        return QueryResponse(
+            ids=[ids],
+            documents=[documents],
+            metadatas=[metadatas]
+        )
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def query_by_similarity(self,
+                                  query_embeddings,
+                                  query_texts=None,
+                                  filters=None,
+                                  top_k=20):
+
+        matches = await self.executor.read(self.store.search, query_embeddings, filters, top_k)
+
+        ids, documents, metadatas, similarities = [], [], [], []
+        for query_matches in matches:
+            query_ids, query_documents, query_metadatas, query_scores = self._to_response(
+                [record for record, _ in query_matches], [score for _, score in query_matches]
+            )
+            ids.append(query_ids)
+            documents.append(query_documents)
+            metadatas.append(query_metadatas)
+            similarities.append(query_scores)
+
+        return QueryResponse(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            distances=similarities
+        )
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def update(self, items):
+
+        updates = [
+            {"id": item.id, "document": item.document, "updated_at": item.updated_at}
+            for item in items
+        ]
+        updated_ids = await self.executor.write(
+            self.store.update, updates, [item.embedding for item in items]
+        )
+
+        logger.info(f"Successfully updated {len(updated_ids)} items in numpy collection.")
+        return updated_ids
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def delete(self, fact_ids):
+
+        deleted_ids = await self.executor.write(self.store.delete, fact_ids)
+
+        logger.info(f"Successfully deleted memory with id {deleted_ids} from numpy collection")
+        return deleted_ids
@@ -1,9 +1,15 @@
 """Postgres with pgvector implementation"""
 # pylint: disable=too-many-positional-arguments, too-many-locals, signature-differs, line-too-long
-from typing import Dict, Any
+import json
+import math
+import struct
+import sys
+import asyncio
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
-from sqlalchemy import text, exc
+from sqlalchemy import event, text, exc
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from memsrv.db.base_adapter import VectorDBAdapter
@@ -16,9 +22,69 @@ from memsrv.telemetry.constants import CustomSpanKinds
 
 logger = get_logger(__name__)
 
+# pgvector binary format: uint16 dims, uint16 unused, then big-endian floats
+_VECTOR_HEADER = struct.Struct(">HH")
+
+def encode_vector(value) -> bytes:
+    """Encodes a list of floats into the pgvector `vector` binary format"""
+    if isinstance(value, bytes):
+        # Already encoded, e.g. elements of a vector[] param
+        return value
+    if isinstance(value, str):
+        raise TypeError("vector params are sent in binary, bind a list of floats, not its text form")
+    floats = array("f", value)
+    if sys.byteorder == "little":
+        floats.byteswap()
+    return _VECTOR_HEADER.pack(len(floats), 0) + floats.tobytes()
+
+def decode_vector(data: bytes) -> List[float]:
+    """Decodes the pgvector `vector` binary format into a list of floats"""
+    dims, _ = _VECTOR_HEADER.unpack_from(data)
+    floats = array("f")
+    floats.frombytes(data[_VECTOR_HEADER.size:_VECTOR_HEADER.size + 4 * dims])
+    if sys.byteorder == "little":
+        floats.byteswap()
+    return floats.tolist()
+
+def encode_halfvec(value) -> bytes:
+    """Encodes a list of floats into the pgvector `halfvec` binary format"""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        raise TypeError("halfvec params are sent in binary, bind a list of floats, not its text form")
+    return struct.pack(f">HH{len(value)}e", len(value), 0, *value)
+
+def decode_halfvec(data: bytes) -> List[float]:
+    """Decodes the pgvector `halfvec` binary format into a list of floats"""
+    dims, _ = _VECTOR_HEADER.unpack_from(data)
+    return list(struct.unpack_from(f">{dims}e", data, _VECTOR_HEADER.size))
+
+_VECTOR_CODECS = {
+    "vector": (encode_vector, decode_vector),
+    # halfvec only exists from pgvector 0.7
+    "halfvec": (encode_halfvec, decode_halfvec),
+}
+
+async def _set_vector_codecs(conn):
+    """Registers the binary codecs on a raw asyncpg connection"""
+    for type_name, (encoder, decoder) in _VECTOR_CODECS.items():
+        try:
+            await conn.set_type_codec(
+                type_name, schema="public", encoder=encoder, decoder=decoder, format="binary"
+            )
+        except ValueError:
+            # Type is missing, either an older pgvector or the extension isn't created yet
+            logger.debug(f"pgvector type '{type_name}' not found, skipping its codec.")
+
+def _register_vector_codecs(dbapi_connection, _connection_record):
+    """Engine connect hook, vectors travel as binary instead of text"""
+    dbapi_connection.run_async(_set_vector_codecs)
+
 # TODO: Refactor for SQL Injection vulnerability
 class PostgresDBAdapter(VectorDBAdapter):
     """Implements the DB adapter for postgres database using sql alchemy"""
+    supports_transactions = True
+
     def __init__(self, **kwargs):
         """Initializes the adapter using SQLalchemy connection string"""
         super().__init__(**kwargs)
@@ -27,8 +93,25 @@ class PostgresDBAdapter(VectorDBAdapter):
 
         logger.info(f"Using connection {self.connection_string} for postgres.")
 
+        self.index_settings = self._index_settings()
+        self.index_name = f"{self.collection_name}_embedding_idx"
+        # Params the current index was built with, None until it exists
+        self._index_info: Optional[Dict[str, Any]] = None
+        self._index_task: Optional[asyncio.Task] = None
+
         # The engine is created once and manages the connection pool.
-        self.engine = create_async_engine(self.connection_string)
+        self.engine = create_async_engine(
+            self.connection_string,
+            connect_args={"server_settings": self._server_settings()}
+        )
+        event.listen(self.engine.sync_engine, "connect", _register_vector_codecs)
+
+    async def close(self):
+        """Stops a pending deferred index check and closes the connection pool"""
+        if self._index_task is not None:
+            self._index_task.cancel()
+            await asyncio.gather(self._index_task, return_exceptions=True)
+        await self.engine.dispose()
 
     async def setup_database(self):
         """Ensures the pgvector extension is enabled in the database and tables are created."""
@@ -37,6 +120,8 @@ class PostgresDBAdapter(VectorDBAdapter):
                 # Use .begin() to ensure the command is committed
                 await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
                 logger.info("pgvector extension is enabled.")
+            # Connections opened before the extension existed have no vector codec
+            await self.engine.dispose()
 
             logger.info("Creating table with the index")
 
@@ -72,16 +157,233 @@ class PostgresDBAdapter(VectorDBAdapter):
             "distance": row.get("similarity", None)
         }
 
-    # TODO: Use metadata and config when setting postgres index/db
+    def _index_settings(self) -> Dict[str, Any]:
+        """
+        Vector index settings from DB_PROVIDER_CONFIG, e.g.
+        {"index_type": "hnsw", "m": 16, "ef_construction": 64, "ef_search": 40}
+        {"index_type": "ivfflat", "lists": 1000, "probes": 10, "index_min_rows": 10000}
+        """
+        config = self.provider_config
+        index_type = config.get("index_type", "hnsw").lower()
+        if index_type not in ("hnsw", "ivfflat"):
+            raise ValueError(f"Unsupported index_type '{index_type}', use 'hnsw' or 'ivfflat'.")
+        return {
+            "index_type": index_type,
+            "m": int(config.get("m", 16)),
+            "ef_construction": int(config.get("ef_construction", 64)),
+            # None means derived from the row count at build time
+            "lists": config.get("lists"),
+            "ef_search": int(config.get("ef_search", 40)),
+            "probes": int(config.get("probes", 10)),
+            # Below this many rows an exact scan is fast and ivfflat centroids are meaningless
+            "index_min_rows": int(config.get("index_min_rows", 1000)),
+            # Rebuild once the row count moved by this factor from the one the index was built for
+            "index_rebuild_drift": float(config.get("index_rebuild_drift", 2.0)),
+            # Filtered queries with at most this many candidate rows use exact search
+            "exact_search_max_rows": int(config.get("exact_search_max_rows", 10000)),
+            # pgvector >= 0.8 only, keeps scanning the index until filtered top_k is found
+            "iterative_scan": config.get("iterative_scan"),
+        }
+
+    def _server_settings(self) -> Dict[str, str]:
+        """Query time index params, set once per pooled connection"""
+        settings = {
+            "hnsw.ef_search": str(self.index_settings["ef_search"]),
+            "ivfflat.probes": str(self.index_settings["probes"]),
+        }
+        if self.index_settings["iterative_scan"]:
+            settings[f"{self.index_settings['index_type']}.iterative_scan"] = self.index_settings["iterative_scan"]
+        return settings
+
+    @staticmethod
+    def _ivfflat_lists(row_count: int) -> int:
+        """pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) after that"""
+        if row_count <= 1_000_000:
+            return max(row_count // 1000, 1)
+        return int(math.sqrt(row_count))
+
+    def _index_ddl(self, index_name: str, row_count: int) -> Tuple[str, Dict[str, Any]]:
+        """Builds the CREATE INDEX statement and the params it was built with"""
+        settings = self.index_settings
+        if settings["index_type"] == "hnsw":
+            params = {"m": settings["m"], "ef_construction": settings["ef_construction"]}
+        else:
+            params = {"lists": int(settings["lists"] or self._ivfflat_lists(row_count))}
+
+        with_sql = ", ".join(f"{key} = {value}" for key, value in params.items())
+        ddl = (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {self.collection_name} "
+            f"USING {settings['index_type']} (embedding vector_cosine_ops) WITH ({with_sql});"
+        )
+        return ddl, {"index_type": settings["index_type"], "rows": row_count, **params}
+
+    async def _count_rows(self, exact: bool = False) -> int:
+        """Row count, uses the planner estimate unless exact or never analyzed"""
+        async with self.engine.connect() as conn:
+            if not exact:
+                result = await conn.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name;"),
+                    {"name": self.collection_name}
+                )
+                estimate = result.scalar()
+                if estimate is not None and estimate >= 0:
+                    return int(estimate)
+            result = await conn.execute(text(f"SELECT count(*) FROM {self.collection_name};"))
+            return int(result.scalar())
+
+    async def _get_index_info(self) -> Optional[Dict[str, Any]]:
+        """Returns the params the index was built with, None if there is no index"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(text(
+                """
+                SELECT obj_description(c.oid, 'pg_class') FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relname = :index_name AND n.nspname = 'public';
+                """
+            ), {"index_name": self.index_name})
+            row = result.fetchone()
+        if row is None:
+            return None
+        # Indexes created before index management was added have no comment
+        return json.loads(row[0]) if row[0] else {}
+
+    async def _build_index(self, index_name: str, row_count: int) -> Dict[str, Any]:
+        """Builds the vector index without locking writes and records its params"""
+        ddl, index_info = self._index_ddl(index_name, row_count)
+        # CONCURRENTLY can't run inside a transaction, use autocommit
+        async with self.engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            logger.info(f"Creating index '{index_name}' on {self.collection_name}.embedding... This may take a moment.")
+            await conn.execute(text(ddl))
+            await conn.execute(text(f"COMMENT ON INDEX {index_name} IS '{json.dumps(index_info)}';"))
+        logger.info(f"Index '{index_name}' created successfully with {index_info}.")
+        return index_info
+
+    async def ensure_vector_index(self) -> bool:
+        """
+        Creates the vector index once the table has enough rows.
+        Returns True if the index exists after the call.
+        """
+        if self._index_info is not None:
+            return True
+
+        index_info = await self._get_index_info()
+        if index_info is not None:
+            logger.info(f"Index '{self.index_name}' already exists.")
+            self._index_info = index_info
+            return True
+
+        row_count = await self._count_rows(exact=True)
+        if row_count < self.index_settings["index_min_rows"]:
+            logger.info(
+                f"Deferring index creation, {row_count} rows is below "
+                f"index_min_rows={self.index_settings['index_min_rows']}."
+            )
+            return False
+
+        try:
+            self._index_info = await self._build_index(self.index_name, row_count)
+        except exc.DBAPIError as e:
+            # Catch a potential race condition where another process creates the index
+            # after our check but before this command runs.
+            if "already exists" in str(e).lower():
+                logger.warning(f"Index '{self.index_name}' was created by another process. Continuing.")
+                self._index_info = await self._get_index_info() or {}
+            else:
+                raise ValueError(e) from e
+        return True
+
+    def _schedule_index_check(self):
+        """Checks the deferred index in the background, so writes never wait on a build"""
+        if self._index_info is not None:
+            return
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.create_task(self.ensure_vector_index())
+            self._index_task.add_done_callback(self._on_index_task_done)
+
+    def _on_index_task_done(self, task: asyncio.Task):
+        """Logs a failed deferred build, the next write schedules another attempt"""
+        if self._index_task is task:
+            self._index_task = None
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Deferred build of index '{self.index_name}' failed, retrying on the next write: {error}")
+
+    async def rebuild_index(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Admin operation, rebuilds the vector index concurrently when the row count
+        drifted from the one it was built for (or index params changed).
+        Queries keep using the old index until the new one is swapped in.
+        """
+        row_count = await self._count_rows(exact=True)
+        index_info = await self._get_index_info()
+
+        if index_info is None:
+            # The cached info is stale when the index was dropped outside this process
+            self._index_info = None
+            built = await self.ensure_vector_index()
+            return {"status": "CREATED" if built else "DEFERRED", "rows": row_count}
+
+        _, wanted_info = self._index_ddl(self.index_name, row_count)
+        built_rows = max(int(index_info.get("rows", 0)), 1)
+        drift = max(row_count, 1) / built_rows
+        drift_limit = self.index_settings["index_rebuild_drift"]
+        params_changed = any(
+            index_info.get(key) != value for key, value in wanted_info.items()
+            if key not in ("rows", "lists")
+        )
+        drifted = drift >= drift_limit or drift <= 1 / drift_limit
+
+        if not (force or drifted or params_changed):
+            return {"status": "UP_TO_DATE", "rows": row_count, "index": index_info}
+
+        new_index_name = f"{self.index_name}_rebuild"
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execution_options(isolation_level="AUTOCOMMIT")
+                # Leftover from a failed rebuild would be an invalid index
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {new_index_name};"))
+            new_info = await self._build_index(new_index_name, row_count)
+            async with self.engine.connect() as conn:
+                await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {self.index_name};"))
+                await conn.execute(text(f"ALTER INDEX {new_index_name} RENAME TO {self.index_name};"))
+        except exc.DBAPIError as e:
+            logger.error(f"Failed to rebuild index '{self.index_name}': {e}")
+            raise ValueError(e) from e
+
+        self._index_info = new_info
+        logger.info(f"Rebuilt index '{self.index_name}' for {row_count} rows (drift {drift:.2f}x).")
+        return {"status": "REBUILT", "rows": row_count, "index": new_info}
+
+    async def _ensure_metadata_indexes(self):
+        """
+        Btree indexes backing the metadata filters, listing by scope ordered by
+        updated_at, the consolidation scope (user, app, agent) and sessions.
+        """
+        metadata_indexes = {
+            f"{self.collection_name}_user_app_updated_idx": "(user_id, app_id, updated_at DESC)",
+            f"{self.collection_name}_user_app_agent_idx": "(user_id, app_id, agent_name)",
+            f"{self.collection_name}_session_updated_idx": "(session_id, updated_at DESC)",
+        }
+        async with self.engine.connect() as conn:
+            # CONCURRENTLY so startup never blocks writes on an existing table
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for index_name, columns in metadata_indexes.items():
+                await conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {self.collection_name} {columns};"
+                ))
+        logger.info(f"Metadata indexes ensured for '{self.collection_name}'.")
+
     async def create_collection(self, collection_name, metadata=None, config=None):
         """
-        Creates a new table for memories and an IVFFlat index for fast vector search.
+        Creates a new table for memories, the vector index is created once the
+        table passes `index_min_rows`, see ensure_vector_index.
         This method is idempotent and uses a transaction.
         """
-        # TODO: for postgres get the vector size, idx_name and column names from config/metadata
         vector_size = self.embedding_dim
-        index_name = f"{collection_name}_embedding_idx"
-        index_exists = False
 
         async with self.engine.begin() as conn:
             logger.info(f"Initializing collection '{collection_name}'...")
@@ -103,45 +405,12 @@ class PostgresDBAdapter(VectorDBAdapter):
                 """
             ))
 
-            result = await conn.execute(text(
-                f"""
-                SELECT 1 FROM pg_class c
-                JOIN pg_namespace n ON n.oid = c.relnamespace
-                WHERE c.relname = '{index_name}' AND n.nspname = 'public';
-                """
-            ))
-            if result.fetchone():
-                index_exists = True
-                logger.info(f"Index '{index_name}' already exists.")
-        if not index_exists:
-            try:
-                # Use a connection with autocommit enabled for this specific command.
-                conn = await self.engine.connect()
-                await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await self._ensure_metadata_indexes()
+        await self.ensure_vector_index()
+        return True
 
-                try:
-
-                    logger.info(f"Creating index '{index_name}' on {collection_name}.embedding... This may take a moment.")
-                    await conn.execute(text(
-                        f"""
-                        CREATE INDEX CONCURRENTLY {index_name} ON {collection_name}
-                        USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
-                        """
-                    ))
-                finally:
-                    await conn.close()
-                logger.info(f"Index '{index_name}' created successfully.")
-                return True
-            except exc.DBAPIError as e:
-                # Catch a potential race condition where another process creates the index
-                # after our check but before this command runs.
-                if "already exists" in str(e).lower():
-                    logger.warning(f"Index '{index_name}' was created by another process. Continuing.")
-                else:
-                    raise ValueError(e) from e
-
-    @traced_span(kind=CustomSpanKinds.DB.value)
-    async def add(self, items):
+    def _insert_statement(self, items) -> Tuple[Any, List[Dict[str, Any]]]:
+        """Bulk insert statement and its rows for add"""
 
         serialized_items = serialize_items(items)
 
@@ -150,7 +419,7 @@ class PostgresDBAdapter(VectorDBAdapter):
             {
                 "id": serialized_items["ids"][i],
                 "document": serialized_items["documents"][i],
-                "embedding": str(serialized_items["embeddings"][i]),
+                "embedding": serialized_items["embeddings"][i],
                 "user_id": serialized_items["metadatas"][i]["user_id"],
                 "app_id": serialized_items["metadatas"][i]["app_id"],
                 "session_id": serialized_items["metadatas"][i]["session_id"],
@@ -174,12 +443,19 @@ class PostgresDBAdapter(VectorDBAdapter):
                 embedding = EXCLUDED.embedding,
                 updated_at = NOW();
         """)
+        return insert_stmt, data_to_insert
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def add(self, items):
+
+        insert_stmt, data_to_insert = self._insert_statement(items)
 
         try:
             async with self.engine.begin() as conn:
                 await conn.execute(insert_stmt, data_to_insert)
 
             logger.info(f"Successfully added/updated {len(items)} items in collection '{self.collection_name}'.")
+            self._schedule_index_check()
             return [item.id for item in items]
         except exc.DBAPIError as e:
             if "datetime" in str(e).lower():
@@ -260,44 +536,75 @@ class PostgresDBAdapter(VectorDBAdapter):
                                   top_k=20):
 
         where_sql = self._format_filters(filters=filters)
+        columns_sql = (
+            "id, document, user_id, app_id, session_id, agent_name, event_timestamp, created_at, updated_at, "
+            "1 - (embedding <=> q.query_vector) AS similarity"
+        )
 
-        # Similarity search, converting cosine distance to a similarity score.
-        query_str = f"SELECT id, document, user_id, app_id, session_id, agent_name, event_timestamp, created_at, updated_at, 1 - (embedding <=> :embedding) AS similarity FROM {self.collection_name}"
         if where_sql:
-            query_str += where_sql
-        query_str += " ORDER BY similarity DESC LIMIT :top_k;"
-
-        query = text(query_str)
+            # Filter first: count the candidates through the btree indexes (capped),
+            # small candidate sets get an exact scan of just those rows, large ones
+            # walk the vector index. Only one branch runs, the other is a one-time filter.
+            lateral_sql = f"""
+                (SELECT {columns_sql} FROM {self.collection_name}{where_sql}
+                    AND (SELECT n FROM c) <= :exact_max_rows
+                    ORDER BY similarity DESC LIMIT :top_k)
+                UNION ALL
+                (SELECT {columns_sql} FROM {self.collection_name}{where_sql}
+                    AND (SELECT n FROM c) > :exact_max_rows
+                    ORDER BY embedding <=> q.query_vector LIMIT :top_k)
+            """
+            candidates_sql = f"""
+            , c AS MATERIALIZED (
+                SELECT count(*) AS n FROM (
+                    SELECT 1 FROM {self.collection_name}{where_sql} LIMIT :exact_max_rows + 1
+                ) candidates
+            )"""
+        else:
+            # Ordering by the distance operator lets the planner walk the vector index.
+            lateral_sql = f"""
+                SELECT {columns_sql} FROM {self.collection_name}
+                ORDER BY embedding <=> q.query_vector LIMIT :top_k
+            """
+            candidates_sql = ""
+
+        # All query vectors go in one statement, each one runs its own top-k
+        # through a LATERAL join and rows come back tagged with the query index.
+        # Similarity search, converting cosine distance to a similarity score.
+        query = text(f"""
+            WITH q AS MATERIALIZED (
+                SELECT query_vector, query_index
+                FROM unnest(CAST(:embeddings AS vector[])) WITH ORDINALITY AS u(query_vector, query_index)
+            ){candidates_sql}
+            SELECT q.query_index, m.*
+            FROM q
+            CROSS JOIN LATERAL ({lateral_sql}) m
+            ORDER BY q.query_index, m.similarity DESC;
+        """)
 
-        ids, documents, metadatas, distances = [], [], [], []
+        # Array elements are pre-encoded, asyncpg would treat nested lists as a 2-D array
+        params = {"embeddings": [encode_vector(embedding) for embedding in query_embeddings], "top_k": top_k}
+        if filters:
+            params.update(filters)
+            params["exact_max_rows"] = self.index_settings["exact_search_max_rows"]
+
+        # We return same format for API compatibility, one list per query
+        ids = [[] for _ in query_embeddings]
+        documents = [[] for _ in query_embeddings]
+        metadatas = [[] for _ in query_embeddings]
+        distances = [[] for _ in query_embeddings]
         try:
-            # FIXME: Use a CTE and ROW_NUMBER() to perform all queries in a single round-trip
-            # This would be much more efficient than looping and sending one query per embedding.
             async with self.engine.connect() as conn:
-                for embedding in query_embeddings:
-
-                    params = {"embedding": str(embedding), "top_k": top_k}
-                    if filters:
-                        params.update(filters)
-
-                    result_proxy = await conn.execute(query, params)
-                    # We return same format for API compatibility
-                    result_ids = []
-                    result_documents = []
-                    result_metadatas = []
-                    result_distances = []
-
-                    for row in result_proxy.mappings():
-                        parsed_row = self._parse_row(row)
-                        result_ids.append(parsed_row["id"])
-                        result_documents.append(parsed_row["document"])
-                        result_metadatas.append(parsed_row["metadata"])
-                        result_distances.append(parsed_row["distance"])
-
-                    ids.append(result_ids)
-                    documents.append(result_documents)
-                    metadatas.append(result_metadatas)
-                    distances.append(result_distances)
+                result_proxy = await conn.execute(query, params)
+
+                for row in result_proxy.mappings():
+                    # ordinality is 1-based
+                    query_index = row["query_index"] - 1
+                    parsed_row = self._parse_row(row)
+                    ids[query_index].append(parsed_row["id"])
+                    documents[query_index].append(parsed_row["document"])
+                    metadatas[query_index].append(parsed_row["metadata"])
+                    distances[query_index].append(parsed_row["distance"])
 
             return QueryResponse(
                 ids=ids,
@@ -309,52 +616,97 @@ class PostgresDBAdapter(VectorDBAdapter):
             logger.error(f"An unexpected database error occurred: {e}")
             raise ValueError(e) from e
 
-    @traced_span(kind=CustomSpanKinds.DB.value)
-    async def update(self, items):
-
-        data_to_update = [
-            {
-                "id": item.id,
-                "document": item.document,
-                "embedding": str(item.embedding),
-                "updated_at": datetime.fromisoformat(item.updated_at),
-            }
-            for item in items
-        ]
+    def _update_statement(self, items) -> Tuple[Any, Dict[str, Any]]:
+        """Batched update statement and its array params"""
 
+        # One statement for the whole batch, ids that don't exist simply don't join
         update_stmt = text(f"""
-            UPDATE {self.collection_name}
+            UPDATE {self.collection_name} AS m
             SET
-                document = :document,
-                embedding = :embedding,
-                updated_at = :updated_at
-            WHERE id = :id;
+                document = v.document,
+                embedding = v.embedding,
+                updated_at = v.updated_at
+            FROM unnest(
+                CAST(:ids AS text[]), CAST(:documents AS text[]),
+                CAST(:embeddings AS vector[]), CAST(:updated_ats AS timestamptz[])
+            ) AS v(id, document, embedding, updated_at)
+            WHERE m.id = v.id
+            RETURNING m.id;
         """)
+        params = {
+            "ids": [item.id for item in items],
+            "documents": [item.document for item in items],
+            "embeddings": [encode_vector(item.embedding) for item in items],
+            "updated_ats": [datetime.fromisoformat(item.updated_at) for item in items],
+        }
+        return update_stmt, params
+
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def update(self, items):
+
+        update_stmt, params = self._update_statement(items)
 
         try:
             async with self.engine.begin() as conn:
-                await conn.execute(update_stmt, data_to_update)
+                result = await conn.execute(update_stmt, params)
+                updated_ids = [row[0] for row in result]
 
-            logger.info(f"Successfully updated {len(items)} items in collection '{self.collection_name}'.")
-            return [item.id for item in items]
+            logger.info(f"Successfully updated {len(updated_ids)} items in collection '{self.collection_name}'.")
+            return updated_ids
         except exc.DBAPIError as e:
             logger.error(f"An unexpected database error occurred: {e}")
             raise ValueError(e) from e
 
+    def _delete_statement(self):
+        """Delete statement returning the ids that existed"""
+        return text(f"""
+            DELETE FROM {self.collection_name}
+            WHERE id = ANY(:ids)
+            RETURNING id;
+        """)
+
     @traced_span(kind=CustomSpanKinds.DB.value)
     async def delete(self, fact_ids):
 
-        delete_stmt = text(f"""
-            DELETE FROM {self.collection_name}
-            WHERE id = ANY(:ids);
-        """)
+        delete_stmt = self._delete_statement()
 
         try:
             async with self.engine.begin() as conn:
-                await conn.execute(delete_stmt, {"ids": fact_ids})
+                result = await conn.execute(delete_stmt, {"ids": fact_ids})
+                deleted_ids = [row[0] for row in result]
+
+            logger.info(f"Successfully deleted {len(deleted_ids)} items from collection '{self.collection_name}'.")
+            return deleted_ids
+        except exc.DBAPIError as e:
+            logger.error(f"An unexpected database error occurred: {e}")
+            raise ValueError(e) from e
 
-            logger.info(f"Successfully deleted {len(fact_ids)} items from collection '{self.collection_name}'.")
-            return fact_ids
+    @traced_span(kind=CustomSpanKinds.DB.value)
+    async def apply_changes(self, add_items, update_items, delete_ids):
+
+        # Same statements as add/update/delete, committed or rolled back together
+        try:
+            async with self.engine.begin() as conn:
+                added_ids, updated_ids, deleted_ids = [], [], []
+                if add_items:
+                    insert_stmt, data_to_insert = self._insert_statement(add_items)
+                    await conn.execute(insert_stmt, data_to_insert)
+                    added_ids = [item.id for item in add_items]
+                if update_items:
+                    update_stmt, params = self._update_statement(update_items)
+                    result = await conn.execute(update_stmt, params)
+                    updated_ids = [row[0] for row in result]
+                if delete_ids:
+                    result = await conn.execute(self._delete_statement(), {"ids": delete_ids})
+                    deleted_ids = [row[0] for row in result]
+
+            logger.info(
+                f"Applied {len(added_ids)} adds, {len(updated_ids)} updates and "
+                f"{len(deleted_ids)} deletes in one transaction on '{self.collection_name}'."
+            )
+            if added_ids:
+                self._schedule_index_check()
+            return added_ids, updated_ids, deleted_ids
         except exc.DBAPIError as e:
             logger.error(f"An unexpected database error occurred: {e}")
             raise ValueError(e) from e
@@ -1,12 +1,14 @@
 """Abstract class to add, query to vector DB"""
 # pylint: disable=unnecessary-pass, too-many-positional-arguments
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from memsrv.models.memory import MemoryInDB, MemoryUpdatePayload
 from memsrv.models.response import QueryResponse
 
 class VectorDBAdapter(ABC):
     """Abstract interface for any vector DB provider."""
+    # Adapters that can commit adds, updates and deletes together override apply_changes
+    supports_transactions: bool = False
 
     def __init__(self,
                  collection_name: str,
@@ -35,6 +37,14 @@ class VectorDBAdapter(ABC):
         """Class method to setup database during startup"""
         pass
 
+    async def rebuild_index(self, force: bool = False) -> Dict[str, Any]:
+        """Admin op to rebuild the vector index, adapters managing their own index can skip it"""
+        return {"status": "UNSUPPORTED"}
+
+    async def close(self):
+        """Releases pools, files and connections on shutdown, adapters owning none can skip it"""
+        pass
+
     @abstractmethod
     async def create_collection(self,
                                 collection_name: str,
@@ -52,15 +62,32 @@ class VectorDBAdapter(ABC):
     @abstractmethod
     async def update(self,
                      items: List[MemoryUpdatePayload]) -> List[str]:
-        """Updates items at given with new data, fact_id should be provided"""
+        """
+        Updates items at given with new data, fact_id should be provided.
+        Ids that don't exist are skipped, returns the ids that were updated.
+        """
         pass
 
     @abstractmethod
     async def delete(self,
-                     fact_ids: List[str]):
-        """Deletes items with provided id"""
+                     fact_ids: List[str]) -> List[str]:
+        """Deletes items with provided id, returns the ids that existed and were deleted"""
         pass
 
+    async def apply_changes(self,
+                            add_items: List[MemoryInDB],
+                            update_items: List[MemoryUpdatePayload],
+                            delete_ids: List[str]) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Applies adds, updates and deletes in one transaction, returns the added,
+        updated and deleted ids. Adapters setting supports_transactions override it,
+        the default just runs the writes in order with no atomicity.
+        """
+        added_ids = await self.add(items=add_items) if add_items else []
+        updated_ids = await self.update(items=update_items) if update_items else []
+        deleted_ids = await self.delete(fact_ids=delete_ids) if delete_ids else []
+        return added_ids, updated_ids, deleted_ids
+
     @abstractmethod
     async def get_by_ids(self,
                          ids: List[str]) -> QueryResponse:
@@ -0,0 +1,61 @@
+"""Bounded thread pool for embedded (in-process) DB clients with blocking APIs"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Callable
+
+from memsrv.telemetry.metrics import metrics
+
+class BlockingDBExecutor:
+    """
+    Runs blocking client calls on a dedicated pool so they never stall the event loop.
+    Reads run concurrently up to max_workers, writes are serialized with each other
+    since embedded stores (SQLite, HNSW files) take a single writer anyway.
+    Callers wait on a semaphore rather than the pool's unbounded queue, so the
+    queue depth and wait time can be published under `{name}.*`.
+    """
+    def __init__(self, name: str, max_workers: int = 4):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(max_workers)
+        self._write_lock = asyncio.Lock()
+        self._queued = 0
+
+    def _set_queued(self, delta: int):
+        """Updates the number of calls waiting for a worker"""
+        self._queued += delta
+        metrics.set_gauge(f"{self.name}.queue_depth", self._queued)
+
+    async def _submit(self, func: Callable[..., Any], write: bool, *args, **kwargs) -> Any:
+        """Waits for the write lock (writes only) and a free worker, then runs func on the pool"""
+        queued_at = time.perf_counter()
+        started = False
+        self._set_queued(1)
+        try:
+            async with self._write_lock if write else nullcontext():
+                async with self._slots:
+                    started = True
+                    self._set_queued(-1)
+                    metrics.increment(f"{self.name}.wait_ms", (time.perf_counter() - queued_at) * 1000)
+                    metrics.increment(f"{self.name}.writes" if write else f"{self.name}.reads")
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._pool, partial(func, *args, **kwargs))
+        finally:
+            # Cancelled while still waiting, the call never started
+            if not started:
+                self._set_queued(-1)
+
+    async def read(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs a read-only call, concurrently with other reads and writes"""
+        return await self._submit(func, False, *args, **kwargs)
+
+    async def write(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs a mutating call, one write at a time"""
+        return await self._submit(func, True, *args, **kwargs)
+
+    def shutdown(self):
+        """Stops the pool once in-flight calls finish"""
+        self._pool.shutdown(wait=True)
@@ -1,4 +1,6 @@
 """Common utils for db adapters"""
+import threading
+from contextlib import contextmanager
 from typing import List, Dict, Any
 from memsrv.models.memory import MemoryInDB
 
@@ -27,3 +29,43 @@ def serialize_items(items: List[MemoryInDB], include_system_fields: bool = True)
         "embeddings": embeddings,
         "metadatas": metadatas,
     }
+
+def to_similarities(distances: List[List[float]]) -> List[List[float]]:
+    """Converts per query cosine distances into cosine similarities"""
+    return [[1 - distance for distance in row] for row in distances]
+
+class ReadWriteLock:
+    """Many concurrent readers or a single writer, for in-process stores read from executor threads"""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+
+    @contextmanager
+    def read(self):
+        """Shared access, e.g. knn queries"""
+        with self._cond:
+            while self._writer:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Exclusive access, e.g. inserts and resizes"""
+        with self._cond:
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
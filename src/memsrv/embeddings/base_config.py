@@ -1,7 +1,7 @@
 """Base class for embedding config parameters"""
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any
 
 @dataclass
 class BaseEmbeddingConfig:
@@ -9,3 +9,6 @@ class BaseEmbeddingConfig:
     model_name: str
     api_key: str
     embedding_dims: Optional[int] = 768
+    task_type: Optional[str] = "RETRIEVAL_DOCUMENT"
+    # Provider specific params, e.g. latency profile for the mock provider
+    provider_config: Dict[str, Any] = field(default_factory=dict)
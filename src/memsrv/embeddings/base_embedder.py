@@ -7,6 +7,9 @@ from memsrv.embeddings.base_config import BaseEmbeddingConfig
 
 class BaseEmbedding(ABC):
     """Abstract interface for any embedding model provider."""
+    # Max number of texts the provider accepts in a single call
+    max_batch_size: int = 100
+
     def __init__(self,
                  config: Optional[Union[BaseEmbeddingConfig, Dict]]=None):
         if isinstance(config, dict):
@@ -0,0 +1,100 @@
+"""Coalesces concurrent embedding calls into provider sized batches"""
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from memsrv.embeddings.base_embedder import BaseEmbedding
+
+from memsrv.utils.logger import get_logger
+from memsrv.utils.exceptions import APIError
+from memsrv.telemetry.metrics import metrics
+
+logger = get_logger(__name__)
+
+class _PendingRequest:
+    """Texts of a single caller and the slots for their vectors"""
+    def __init__(self, texts: List[str], future: asyncio.Future):
+        self.future = future
+        self.results: List[Optional[List[float]]] = [None] * len(texts)
+        self.remaining = len(texts)
+
+class BatchingEmbedding(BaseEmbedding):
+    """
+    Wraps any BaseEmbedding and gathers texts from concurrent callers for
+    a short window (or until the provider's max batch size is reached)
+    and sends them as one call. Each caller gets back only its own slice.
+    """
+    def __init__(self,
+                 embedder: BaseEmbedding,
+                 max_wait_ms: float = 5.0,
+                 max_batch_size: Optional[int] = None):
+        super().__init__(config=embedder.config)
+        self.embedder = embedder
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size or embedder.max_batch_size
+        self._queue: List[Tuple[_PendingRequest, int, str]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Keep references so in-flight batches are not garbage collected
+        self._batches: Set[asyncio.Task] = set()
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Queues the texts and waits for the batch containing them"""
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        request = _PendingRequest(texts, loop.create_future())
+        self._queue.extend((request, i, text) for i, text in enumerate(texts))
+
+        self._drain(force=False)
+        if self._queue and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._on_timer)
+
+        return await request.future
+
+    def _on_timer(self):
+        """Flushes whatever is queued once the window elapses"""
+        self._timer = None
+        self._drain(force=True)
+
+    def _drain(self, force: bool):
+        """Sends full batches, and the partial one too if forced"""
+        while len(self._queue) >= self.max_batch_size or (force and self._queue):
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+        metrics.set_gauge("embedding_batcher.queued_texts", len(self._queue))
+
+    async def _run_batch(self, batch: List[Tuple[_PendingRequest, int, str]]):
+        """Embeds one batch and hands each caller its vectors"""
+        callers = {id(request) for request, _, _ in batch}
+        metrics.increment("embedding_batcher.batches")
+        metrics.increment("embedding_batcher.texts", len(batch))
+        logger.debug(f"Embedding batch of {len(batch)} texts from {len(callers)} callers.")
+
+        try:
+            vectors = await self.embedder.generate_embeddings(
+                texts=[text for _, _, text in batch]
+            )
+        except Exception as e:
+            for request, _, _ in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        if len(vectors) != len(batch):
+            # A short answer would leave the callers at the end of the batch waiting forever
+            error = APIError(
+                f"Embedding provider returned {len(vectors)} vectors for {len(batch)} texts."
+            )
+            for request, _, _ in batch:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            return
+
+        for (request, index, _), vector in zip(batch, vectors):
+            request.results[index] = vector
+            request.remaining -= 1
+            if request.remaining == 0 and not request.future.done():
+                request.future.set_result(request.results)
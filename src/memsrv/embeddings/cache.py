@@ -0,0 +1,164 @@
+"""Content addressed cache layer in front of any embedding provider"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from memsrv.embeddings.base_embedder import BaseEmbedding
+
+from memsrv.utils.logger import get_logger
+from memsrv.telemetry.metrics import metrics
+
+logger = get_logger(__name__)
+
+class LRUEmbeddingStore:
+    """In-process LRU tier, holds the most recently used vectors"""
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Returns the vector and marks it as recently used"""
+        vector = self._items.get(key)
+        if vector is not None:
+            self._items.move_to_end(key)
+        return vector
+
+    def put(self, key: str, vector: List[float]):
+        """Adds the vector, evicting the least recently used ones if full"""
+        self._items[key] = vector
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+class DiskEmbeddingStore:
+    """
+    Optional on-disk tier backed by sqlite, survives restarts.
+    Vectors are stored as packed float32 blobs to keep the file small.
+    """
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The store is accessed from worker threads, guard the connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Returns the vectors found for the given keys"""
+        if not keys:
+            return {}
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+
+        found = {}
+        for key, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            found[key] = vector.tolist()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """Persists the given vectors"""
+        if not items:
+            return
+        rows = [(key, array("f", vector).tobytes()) for key, vector in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Wraps any BaseEmbedding and only forwards cache misses to it.
+    Keys are derived from model name, dims, task type and a hash of the text,
+    so changing any of them never serves stale vectors.
+    """
+    def __init__(self,
+                 embedder: BaseEmbedding,
+                 max_size: int = 10000,
+                 disk_path: Optional[str] = None):
+        super().__init__(config=embedder.config)
+        self.embedder = embedder
+        self.memory_store = LRUEmbeddingStore(max_size=max_size)
+        self.disk_store = DiskEmbeddingStore(disk_path) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_key(self, text: str) -> str:
+        """Builds the content address for a text"""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return (
+            f"{self.config.model_name}:{self.config.embedding_dims}:"
+            f"{self.config.task_type}:{text_hash}"
+        )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters, useful for sizing the cache"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.memory_store)
+        }
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Returns cached vectors where possible and embeds only the misses"""
+        keys = [self._cache_key(text) for text in texts]
+        results: Dict[str, List[float]] = {}
+
+        for key in keys:
+            vector = self.memory_store.get(key)
+            if vector is not None:
+                results[key] = vector
+
+        pending = [key for key in dict.fromkeys(keys) if key not in results]
+        if pending and self.disk_store:
+            from_disk = await asyncio.to_thread(self.disk_store.get_many, pending)
+            for key, vector in from_disk.items():
+                self.memory_store.put(key, vector)
+            results.update(from_disk)
+
+        # Duplicate texts within the same call are embedded only once
+        missing_texts = {}
+        for key, text in zip(keys, texts):
+            if key not in results and key not in missing_texts:
+                missing_texts[key] = text
+
+        hit_count = len(texts) - len(missing_texts)
+        self.hits += hit_count
+        self.misses += len(missing_texts)
+        metrics.increment("embedding_cache.hits", hit_count)
+        metrics.increment("embedding_cache.misses", len(missing_texts))
+        metrics.set_gauge("embedding_cache.size", len(self.memory_store))
+
+        if missing_texts:
+            new_vectors = await self.embedder.generate_embeddings(
+                texts=list(missing_texts.values())
+            )
+            fresh = dict(zip(missing_texts.keys(), new_vectors))
+            for key, vector in fresh.items():
+                self.memory_store.put(key, vector)
+            if self.disk_store:
+                await asyncio.to_thread(self.disk_store.put_many, fresh)
+            results.update(fresh)
+
+        logger.debug(f"Embedding cache: {hit_count} hits, {len(missing_texts)} misses.")
+
+        return [results[key] for key in keys]
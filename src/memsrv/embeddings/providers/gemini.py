@@ -24,11 +24,12 @@ class GeminiEmbedding(BaseEmbedding):
         self.client = geminiClient(api_key=self.config.api_key)
 
     @traced_span(kind=CustomSpanKinds.EMBEDDING.value)
-    @rate_limited(calls_per_second=2.0)
+    # Retries sit outside the limiter so every attempt takes a token
     @retry_with_backoff(max_retries=3,
                         base_delay=1,
                         max_delay=8,
                         retry_on_exceptions=(RetryableAPIError,))
+    @rate_limited(calls_per_second=2.0, burst=2, max_concurrency=8)
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generates embeddings for a list of texts using Gemini embedding models."""
         try:
@@ -37,7 +38,7 @@ class GeminiEmbedding(BaseEmbedding):
                 model=self.config.model_name,
                 contents=texts,
                 config=EmbedContentConfig(
-                    task_type="RETRIEVAL_DOCUMENT",
+                    task_type=self.config.task_type,
                     output_dimensionality=self.config.embedding_dims
                 )
             )
@@ -64,7 +65,8 @@ class GeminiEmbedding(BaseEmbedding):
 
             if getattr(e, 'status', None) in ["RESOURCE_EXHAUSTED", "UNAVAILABLE", "INTERNAL"]:
                 raise RetryableAPIError(
-                    f"Gemini API is temporarily unavailable ({e.status}). {e.message}"
+                    f"Gemini API is temporarily unavailable ({e.status}). {e.message}",
+                    reason=e.status
                 ) from e
 
             raise APIError(f"Unexpected Gemini API error occurred ({e.status}),{e.message}") from e
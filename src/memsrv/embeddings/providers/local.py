@@ -0,0 +1,73 @@
+"""Embeddings generator using a local sentence-transformers model on CPU"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from memsrv.embeddings.base_embedder import BaseEmbedding
+from memsrv.embeddings.base_config import BaseEmbeddingConfig
+
+from memsrv.utils.logger import get_logger
+from memsrv.utils.exceptions import ConfigurationError
+
+from memsrv.telemetry.constants import CustomSpanKinds
+from memsrv.telemetry.tracing import traced_span
+from memsrv.telemetry.helpers import trace_embedder_call
+
+logger = get_logger(__name__)
+
+class LocalEmbedding(BaseEmbedding):
+    """
+    Embedding module running an in-process model on CPU, no network calls.
+    The model is loaded once when the service starts and encoding is pushed
+    to a small thread pool so it doesn't block the event loop.
+    e.g, EMBEDDING_MODEL=sentence-transformers/all-mpnet-base-v2 (768 dims)
+    """
+    max_batch_size: int = 64
+    # torch already uses multiple threads per encode call, few workers are enough
+    max_workers: int = 2
+
+    def __init__(self, config: Optional[BaseEmbeddingConfig]=None):
+        super().__init__(config=config)
+        try:
+            from sentence_transformers import SentenceTransformer # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ConfigurationError(
+                "sentence-transformers is required for local embeddings, "
+                "install it with `uv sync --group local-embeddings`."
+            ) from e
+
+        logger.info(f"Loading local embedding model '{self.config.model_name}' on cpu.")
+        self.model = SentenceTransformer(self.config.model_name, device="cpu")
+
+        model_dims = self.model.get_sentence_embedding_dimension()
+        if self.config.embedding_dims and model_dims and self.config.embedding_dims > model_dims:
+            raise ConfigurationError(
+                f"Model '{self.config.model_name}' produces {model_dims} dims, "
+                f"can not serve EMBEDDING_DIM={self.config.embedding_dims}."
+            )
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix="local-embedder")
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Blocking encode, runs in the executor"""
+        vectors = self.model.encode(texts,
+                                    batch_size=self.max_batch_size,
+                                    convert_to_numpy=True,
+                                    normalize_embeddings=True)
+        if self.config.embedding_dims:
+            # Truncation works well for matryoshka style models, re-normalize after
+            vectors = vectors[:, :self.config.embedding_dims]
+            norms = (vectors ** 2).sum(axis=1, keepdims=True) ** 0.5
+            vectors = vectors / norms.clip(min=1e-12)
+        return vectors.tolist()
+
+    @traced_span(kind=CustomSpanKinds.EMBEDDING.value)
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generates embeddings for a list of texts using the local model."""
+        loop = asyncio.get_running_loop()
+        embedding_result = await loop.run_in_executor(self.executor, self._encode, texts)
+
+        trace_embedder_call(provider=self.config.model_name)
+
+        return embedding_result
@@ -0,0 +1,58 @@
+"""Deterministic hash based embeddings for load testing memsrv"""
+import hashlib
+import math
+import random
+from typing import List, Optional
+
+from memsrv.embeddings.base_embedder import BaseEmbedding
+from memsrv.embeddings.base_config import BaseEmbeddingConfig
+
+from memsrv.utils.latency import LatencyProfile
+from memsrv.utils.retry import retry_with_backoff
+from memsrv.utils.exceptions import RetryableAPIError
+
+from memsrv.telemetry.constants import CustomSpanKinds
+from memsrv.telemetry.tracing import traced_span
+from memsrv.telemetry.helpers import trace_embedder_call
+
+class MockEmbedding(BaseEmbedding):
+    """
+    Stand-in embedding provider, each token is hashed to a fixed random
+    direction and a text is the normalized sum of its tokens. Same text always
+    gives the same vector and texts sharing words end up close to each other.
+    Latency and error rate come from `EMBEDDING_PROVIDER_CONFIG`.
+    """
+    def __init__(self, config: Optional[BaseEmbeddingConfig]=None):
+        super().__init__(config=config)
+        self.latency = LatencyProfile.from_dict(self.config.provider_config)
+
+    def _token_vector(self, token: str) -> List[float]:
+        """Fixed pseudo random direction for a token"""
+        seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "big")
+        rng = random.Random(seed)
+        return [rng.gauss(0.0, 1.0) for _ in range(self.config.embedding_dims)]
+
+    def _embed(self, text: str) -> List[float]:
+        """Normalized sum of the token directions"""
+        tokens = text.lower().split() or [text]
+        vector = [0.0] * self.config.embedding_dims
+        for token in tokens:
+            for i, value in enumerate(self._token_vector(token)):
+                vector[i] += value
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    @traced_span(kind=CustomSpanKinds.EMBEDDING.value)
+    @retry_with_backoff(max_retries=3,
+                        base_delay=1,
+                        max_delay=8,
+                        retry_on_exceptions=(RetryableAPIError,))
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generates deterministic embeddings after the simulated provider delay."""
+        await self.latency.simulate(operation="generate_embeddings")
+
+        embedding_result = [self._embed(text) for text in texts]
+
+        trace_embedder_call(provider=self.config.model_name)
+
+        return embedding_result
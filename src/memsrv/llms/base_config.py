@@ -1,7 +1,7 @@
 """Base class for llms config parameters"""
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any
 
 @dataclass
 class BaseLLMConfig:
@@ -12,3 +12,5 @@ class BaseLLMConfig:
     max_output_tokens: int = 1024
     top_p: float = 0.1
     top_k: float = 1
+    # Provider specific params, e.g. latency profile for the mock provider
+    provider_config: Dict[str, Any] = field(default_factory=dict)
@@ -29,11 +29,12 @@ class GeminiModel(BaseLLM):
         self.client = geminiClient(api_key=api_key)
 
     @traced_span(kind=CustomSpanKinds.LLM.value)
-    @rate_limited(calls_per_second=2.0)
+    # Retries sit outside the limiter so every attempt takes a token
     @retry_with_backoff(max_retries=3,
                         base_delay=1,
                         max_delay=8,
                         retry_on_exceptions=(RetryableAPIError,))
+    @rate_limited(calls_per_second=2.0, burst=2, max_concurrency=8)
     async def generate_response(self,
                                 message: str,
                                 system_instruction: str = None,
@@ -84,7 +85,8 @@ class GeminiModel(BaseLLM):
 
             if getattr(e, 'status', None) in ["RESOURCE_EXHAUSTED", "UNAVAILABLE", "INTERNAL"]:
                 raise RetryableAPIError(
-                    f"Gemini API is temporarily unavailable ({e.status}). {e.message}"
+                    f"Gemini API is temporarily unavailable ({e.status}). {e.message}",
+                    reason=e.status
                 ) from e
 
             raise APIError(f"Unexpected Gemini API error occurred ({e.status}),{e.message}") from e
@@ -0,0 +1,115 @@
+"""Deterministic mock llm for load testing memsrv without a real provider"""
+import json
+from typing import Any, Dict, List, Optional
+
+from memsrv.llms.base_config import BaseLLMConfig
+from memsrv.llms.base_llm import BaseLLM
+
+from memsrv.utils.logger import get_logger
+from memsrv.utils.latency import LatencyProfile
+from memsrv.utils.tokens import estimate_tokens
+from memsrv.utils.retry import retry_with_backoff
+from memsrv.utils.exceptions import RetryableAPIError, ConfigurationError
+
+from memsrv.telemetry.constants import CustomSpanKinds
+from memsrv.telemetry.tracing import traced_span
+from memsrv.telemetry.helpers import trace_llm_call
+
+logger = get_logger(__name__)
+
+class MockModel(BaseLLM):
+    """
+    Stand-in for a real LLM that returns schema valid `Facts` and
+    `ConsolidationPlan` json derived from the prompt. Latency and error
+    rate come from `LLM_PROVIDER_CONFIG`, see LatencyProfile.
+    Not rate limited on purpose, so the service's own overhead can be measured.
+    """
+    def __init__(self, config: Optional[BaseLLMConfig]=None):
+        super().__init__(config)
+
+        if not self.config.model_name:
+            self.config.model_name = "mock-llm"
+
+        self.latency = LatencyProfile.from_dict(self.config.provider_config)
+        # Extraction heuristic, user turns shorter than this are treated as chatter
+        self.min_fact_words = self.config.provider_config.get("min_fact_words", 4)
+
+    def _extract_facts(self, message: str) -> Dict[str, Any]:
+        """Every user turn long enough is considered a fact, context turns are skipped"""
+        facts = []
+        lines = message.splitlines()
+        for i, line in enumerate(lines):
+            if line.startswith("Now, extract the facts"):
+                lines = lines[i + 1:]
+                break
+        for line in lines:
+            if not line.startswith("User: "):
+                continue
+            text = line[len("User: "):].strip()
+            if len(text.split()) >= self.min_fact_words and text not in facts:
+                facts.append(text)
+        return {"facts": facts}
+
+    def _parse_section(self, message: str, header: str) -> List[str]:
+        """Reads the lines after a section header up to the next blank line"""
+        lines = message.splitlines()
+        for i, line in enumerate(lines):
+            if line.strip() == header:
+                section = []
+                for item in lines[i + 1:]:
+                    if not item.strip():
+                        break
+                    section.append(item)
+                return [] if section == ["(none)"] else section
+        return []
+
+    def _consolidate(self, message: str) -> Dict[str, Any]:
+        """Exact duplicates are left out, everything else is created"""
+        existing = self._parse_section(message, "EXISTING_MEMORIES:")
+        if "\nNEW_MESSAGES:\n" in message:
+            # Fused mode, facts come from the conversation itself
+            conversation = message.split("\nNEW_MESSAGES:\n", 1)[1]
+            new_facts = self._extract_facts(conversation)["facts"]
+        else:
+            new_facts = [line[len("- "):] for line in self._parse_section(message, "NEW_FACTS:")]
+        existing_texts = {line.split(": ", 1)[-1] for line in existing}
+
+        plan = [{"action": "CREATE", "text": fact} for fact in new_facts if fact not in existing_texts]
+        return {"plan": plan}
+
+    @traced_span(kind=CustomSpanKinds.LLM.value)
+    @retry_with_backoff(max_retries=3,
+                        base_delay=1,
+                        max_delay=8,
+                        retry_on_exceptions=(RetryableAPIError,))
+    async def generate_response(self,
+                                message: str,
+                                system_instruction: str = None,
+                                response_format=None) -> str:
+
+        await self.latency.simulate(operation="generate_response")
+
+        schema_title = (response_format or {}).get("title")
+        if schema_title == "Facts":
+            output = self._extract_facts(message)
+        elif schema_title == "ConsolidationPlan":
+            output = self._consolidate(message)
+        else:
+            raise ConfigurationError(f"Mock LLM does not support response format '{schema_title}'.")
+
+        response_text = json.dumps(output)
+        # Rough character based estimate, good enough for comparing runs
+        prompt_tokens = estimate_tokens(message) + estimate_tokens(system_instruction or "")
+        completion_tokens = estimate_tokens(response_text)
+        trace_llm_call(provider="mock",
+                       model_name=self.config.model_name,
+                       invocation_parameters=self.config.provider_config,
+                       system_instructions=system_instruction,
+                       user_message=message,
+                       output_message=response_text,
+                       token_count={
+                           "prompt": prompt_tokens,
+                           "completion": completion_tokens,
+                           "total": prompt_tokens + completion_tokens
+                       })
+        return response_text
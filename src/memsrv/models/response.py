@@ -36,3 +36,17 @@ class MemoriesActionResponse(BaseModel):
     """A generic response model for Create, Update, Delete operations."""
     message: str
     info: List[ActionConfirmation]
+
+class JobAcceptedResponse(BaseModel):
+    """Returned when a generate request is queued as a background job."""
+    job_id: str
+    status: Literal["QUEUED"]
+
+class JobStatusResponse(BaseModel):
+    """State of a background generate job, info is set once it succeeded."""
+    job_id: str
+    status: Literal["QUEUED", "RUNNING", "SUCCEEDED", "FAILED"]
+    created_at: str
+    updated_at: str
+    info: Optional[List[ActionConfirmation]] = None
+    error: Optional[str] = None
@@ -12,6 +12,8 @@ class CustomSpanNames(str, Enum):
     FACT_EXTRACTION = "ExtractFacts"
     FACT_CONSOLIDATION_CHAIN = "ConsolidateFactsChain"
     FACT_CONSOLIDATION = "ConsolidateFacts"
+    FACT_EXTRACT_CONSOLIDATE_CHAIN = "ExtractAndConsolidateFactsChain"
+    FUSED_EXTRACTION_CONSOLIDATION = "ExtractAndConsolidateFacts"
 
     CREATE_MEMORIES_API = "[API] CreateMemoriesAPI"
     UPDATE_MEMORIES_API = "[API] UpdateMemoriesAPI"
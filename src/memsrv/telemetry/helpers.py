@@ -94,3 +94,9 @@ def get_llm_message_attributes(messages: List[Dict[str, Any]],
             attrs[f"{base_key}.{i}.message.content"] = content
 
     return attrs
+
+def trace_token_estimate(token_estimate: dict):
+    """Adds estimated token counts of an llm call to the current (chain) span."""
+    span = trace.get_current_span()
+    for key, val in token_estimate.items():
+        span.set_attribute(f"memsrv.token_count_estimate.{key}", val)
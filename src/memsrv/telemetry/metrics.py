@@ -0,0 +1,45 @@
+"""Lightweight in-process counters and gauges for service internals"""
+import threading
+from collections import defaultdict
+from typing import Dict, Union
+
+Number = Union[int, float]
+
+class MetricsRegistry:
+    """
+    Thread safe registry of named counters and gauges.
+    Counters only go up (hits, misses, skips), gauges hold the latest
+    value (queue depth, in-flight calls). The snapshot is served by the
+    metrics route so it can be scraped without an OTEL metrics backend.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Number] = defaultdict(int)
+        self._gauges: Dict[str, Number] = {}
+
+    def increment(self, name: str, value: Number = 1):
+        """Increments the counter `name` by value"""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: Number):
+        """Sets the gauge `name` to the latest value"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self) -> Dict[str, Dict[str, Number]]:
+        """Returns a copy of all the counters and gauges"""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges)
+            }
+
+    def reset(self):
+        """Clears all values, mostly useful for load tests"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+# Single registry shared across the service
+metrics = MetricsRegistry()
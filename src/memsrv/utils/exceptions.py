@@ -48,7 +48,9 @@ class APIError(MemoryServiceError):
 
 class RetryableAPIError(APIError):
     """A specific API error that indicates the operation can be retried."""
-    def __init__(self, message: str):
+    def __init__(self, message: str, reason: Optional[str] = None):
+        # reason carries the provider status, e.g. RESOURCE_EXHAUSTED, for rate limiting
+        self.reason = reason
         super().__init__(
             message,
             error_code="API_SERVICE_TEMPORARILY_UNAVAILABLE"
@@ -1,7 +1,8 @@
 """All provider factories (LLM, DB, Embeddings) will be created here"""
 
+import os
 import importlib
-from typing import Any, Type
+from typing import Any, Optional, Type
 
 # Once a service is deployed we use only those config throughout
 from config import memory_config
@@ -9,8 +10,12 @@ from memsrv.llms.base_config import BaseLLMConfig
 from memsrv.llms.base_llm import BaseLLM
 from memsrv.embeddings.base_config import BaseEmbeddingConfig
 from memsrv.embeddings.base_embedder import BaseEmbedding
+from memsrv.embeddings.cache import CachedEmbedding
+from memsrv.embeddings.batcher import BatchingEmbedding
 from memsrv.db.base_adapter import VectorDBAdapter
 from memsrv.core.memory_service import MemoryService
+from memsrv.core.watermarks import SessionWatermarkStore
+from memsrv.core.prefilter import ConversationPrefilter
 from memsrv.telemetry.setup import setup_tracer
 
 def load_class(path: str) -> Type[Any]:
@@ -25,6 +30,7 @@ class LLMFactory:
 
     provider_mapping = {
         "gemini": "memsrv.llms.providers.gemini.GeminiModel",
+        "mock": "memsrv.llms.providers.mock.MockModel",
     }
 
     @classmethod
@@ -38,7 +44,8 @@ class LLMFactory:
 
         llm_class = load_class(cls.provider_mapping[provider])
         config = BaseLLMConfig(model_name=model_name,
-                               api_key=memory_config.llm_api_key)
+                               api_key=memory_config.llm_api_key,
+                               provider_config=memory_config.LLM_PROVIDER_CONFIG)
 
         return llm_class(config)
 
@@ -47,6 +54,8 @@ class EmbeddingFactory:
 
     provider_mapping = {
         "gemini": "memsrv.embeddings.providers.gemini.GeminiEmbedding",
+        "local": "memsrv.embeddings.providers.local.LocalEmbedding",
+        "mock": "memsrv.embeddings.providers.mock.MockEmbedding",
     }
 
     @classmethod
@@ -63,9 +72,25 @@ class EmbeddingFactory:
         embedder_class = load_class(cls.provider_mapping[provider])
         config = BaseEmbeddingConfig(model_name=model_name,
                                      api_key=memory_config.llm_api_key,
-                                     embedding_dims=embedding_dim)
+                                     embedding_dims=embedding_dim,
+                                     provider_config=memory_config.EMBEDDING_PROVIDER_CONFIG)
 
-        return embedder_class(config)
+        embedder = embedder_class(config)
+
+        # Cache sits in front of the batcher so only misses get coalesced
+        if memory_config.EMBEDDING_BATCH_ENABLED:
+            embedder = BatchingEmbedding(embedder=embedder,
+                                         max_wait_ms=memory_config.EMBEDDING_BATCH_WINDOW_MS)
+
+        if memory_config.EMBEDDING_CACHE_ENABLED:
+            disk_path = None
+            if memory_config.EMBEDDING_CACHE_DIR:
+                disk_path = os.path.join(memory_config.EMBEDDING_CACHE_DIR, "embeddings.sqlite")
+            embedder = CachedEmbedding(embedder=embedder,
+                                       max_size=memory_config.EMBEDDING_CACHE_SIZE,
+                                       disk_path=disk_path)
+
+        return embedder
 
 class DBFactory:
     """Factory for creating database adapter instances"""
@@ -73,7 +98,9 @@ class DBFactory:
     provider_mapping = {
         "chroma_lite": "memsrv.db.adapters.chroma_lite.ChromaLiteDBAdapter",
         "chroma": "memsrv.db.adapters.chroma.ChromaDBAdapter",
-        "postgres": "memsrv.db.adapters.postgres.PostgresDBAdapter"
+        "postgres": "memsrv.db.adapters.postgres.PostgresDBAdapter",
+        "numpy": "memsrv.db.adapters.numpy_mmap.NumpyMmapDBAdapter",
+        "hnsw_lite": "memsrv.db.adapters.hnsw_lite.HnswLiteDBAdapter"
     }
 
     @classmethod
@@ -89,6 +116,26 @@ class DBFactory:
 
         return await db_instance.setup_database()
 
+class PrefilterFactory:
+    """Factory for the conversation pre-filter run before fact extraction"""
+
+    provider_mapping = {
+        "heuristic": "memsrv.core.prefilter.HeuristicPrefilter",
+    }
+
+    @classmethod
+    def create(cls) -> Optional[ConversationPrefilter]:
+        """Creates the pre-filter using the config, None when disabled"""
+        provider = memory_config.EXTRACTION_PREFILTER
+
+        if provider == "none":
+            return None
+        if provider not in cls.provider_mapping:
+            raise ValueError(f"Unsupported extraction pre-filter: {provider}.")
+
+        prefilter_class = load_class(cls.provider_mapping[provider])
+        return prefilter_class(config=memory_config.EXTRACTION_PREFILTER_CONFIG)
+
 class MemoryServiceFactory:
     """Factory for creating MemoryService"""
 
@@ -102,10 +149,23 @@ class MemoryServiceFactory:
         embedder_instance = EmbeddingFactory.create()
         db_instance = await DBFactory.create()
 
+        watermarks = None
+        if memory_config.EXTRACTION_WATERMARKS_PATH:
+            watermarks = SessionWatermarkStore(path=memory_config.EXTRACTION_WATERMARKS_PATH)
+
         return MemoryService(
             llm=llm_instance,
             db_adapter=db_instance,
             embedder=embedder_instance,
+            merge_consolidation_batches=memory_config.CONSOLIDATION_MERGE_BATCHES,
+            duplicate_threshold=memory_config.CONSOLIDATION_DUPLICATE_THRESHOLD,
+            novelty_threshold=memory_config.CONSOLIDATION_NOVELTY_THRESHOLD,
+            watermarks=watermarks,
+            context_messages=memory_config.EXTRACTION_CONTEXT_MESSAGES,
+            chunk_tokens=memory_config.EXTRACTION_CHUNK_TOKENS,
+            chunk_overlap=memory_config.EXTRACTION_CHUNK_OVERLAP_TURNS,
+            prefilter=PrefilterFactory.create(),
+            fused_max_memories=memory_config.CONSOLIDATION_FUSED_MAX_MEMORIES
         )
 
 class TelemetryFactory:
@@ -0,0 +1,58 @@
+"""Latency and error injection used by the mock providers for load tests"""
+import math
+import random
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Literal, Optional
+
+from memsrv.utils.exceptions import RetryableAPIError
+
+@dataclass
+class LatencyProfile:
+    """
+    Describes how long a simulated provider call takes and how often it fails.
+    e.g, {"distribution": "lognormal", "mean_ms": 800, "stddev_ms": 300, "error_rate": 0.01}
+    """
+    distribution: Literal["fixed", "uniform", "normal", "lognormal"] = "fixed"
+    mean_ms: float = 0.0
+    stddev_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    @classmethod
+    def from_dict(cls, config: Optional[Dict[str, Any]]) -> "LatencyProfile":
+        """Builds the profile from provider config, unknown keys are ignored"""
+        config = config or {}
+        allowed = {"distribution", "mean_ms", "stddev_ms", "error_rate", "seed"}
+        return cls(**{key: value for key, value in config.items() if key in allowed})
+
+    def sample_delay(self) -> float:
+        """Draws a delay in seconds from the configured distribution"""
+        if self.mean_ms <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            delay_ms = self._random.uniform(max(self.mean_ms - self.stddev_ms, 0),
+                                            self.mean_ms + self.stddev_ms)
+        elif self.distribution == "normal":
+            delay_ms = self._random.gauss(self.mean_ms, self.stddev_ms)
+        elif self.distribution == "lognormal":
+            # Parametrized by the mean/stddev of the resulting delay, not of the log
+            variance = self.stddev_ms ** 2
+            sigma_sq = math.log(1 + variance / self.mean_ms ** 2)
+            mu = math.log(self.mean_ms) - sigma_sq / 2
+            delay_ms = self._random.lognormvariate(mu, sigma_sq ** 0.5)
+        else:
+            delay_ms = self.mean_ms
+        return max(delay_ms, 0.0) / 1000
+
+    async def simulate(self, operation: str):
+        """Sleeps for a sampled delay and fails at the configured rate"""
+        delay = self.sample_delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise RetryableAPIError(f"Simulated RESOURCE_EXHAUSTED for {operation}.",
+                                    reason="RESOURCE_EXHAUSTED")
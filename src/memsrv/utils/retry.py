@@ -2,7 +2,10 @@
 import random
 import asyncio
 import functools
+from typing import Any, Dict, Optional, Tuple
 from memsrv.utils.logger import get_logger
+from memsrv.utils.exceptions import RetryableAPIError
+from memsrv.telemetry.metrics import metrics
 
 logger = get_logger(__name__)
 
@@ -57,43 +60,140 @@ def retry_with_backoff(max_retries: int = 5,
         return _wrapper
     return decorator
 
-def rate_limited(calls_per_second: float):
+class TokenBucketLimiter:
     """
-    Decorator to limit async function call rate.
+    Token bucket with a cap on in-flight calls and AIMD backoff.
+
+    Tokens refill at `rate` per second up to `burst`. A caller reserves a token
+    up front (the bucket may go negative) and sleeps only for its own share of
+    the deficit, so waiting callers never block each other behind a lock.
+    When the provider reports RESOURCE_EXHAUSTED the rate is halved, every
+    successful call then adds back a tenth of the configured rate.
+    """
+    def __init__(self,
+                 name: str,
+                 calls_per_second: float,
+                 burst: int = 1,
+                 max_concurrency: Optional[int] = None,
+                 min_calls_per_second: Optional[float] = None):
+        self.name = name
+        self.max_rate = calls_per_second
+        self.min_rate = min_calls_per_second or calls_per_second / 10
+        self.rate = calls_per_second
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.last_refill: Optional[float] = None
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    def _refill(self, now: float):
+        """Adds the tokens earned since the last refill"""
+        if self.last_refill is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def acquire(self):
+        """Reserves a token, sleeping only if the bucket is in deficit"""
+        now = asyncio.get_running_loop().time()
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens < 0:
+            wait_time = -self.tokens / self.rate
+            logger.warning(
+                f"Rate limit exceeded for {self.name}, "
+                f"sleeping {wait_time:.3f}s to respect limit."
+            )
+            await asyncio.sleep(wait_time)
+
+    def on_success(self):
+        """Additive increase back towards the configured rate"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+            metrics.set_gauge(f"rate_limiter.{self.name}.rate", self.rate)
+
+    def on_throttled(self):
+        """Multiplicative decrease when the provider pushes back"""
+        self.rate = max(self.min_rate, self.rate / 2)
+        # Drop any saved up burst so the next calls actually slow down
+        self.tokens = min(self.tokens, 0.0)
+        metrics.increment(f"rate_limiter.{self.name}.throttled")
+        metrics.set_gauge(f"rate_limiter.{self.name}.rate", self.rate)
+        logger.warning(f"Provider throttled {self.name}, reducing rate to {self.rate:.2f}/s.")
+
+    async def __aenter__(self):
+        if self.semaphore:
+            await self.semaphore.acquire()
+        try:
+            await self.acquire()
+        except BaseException:
+            if self.semaphore:
+                self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.semaphore:
+            self.semaphore.release()
+
+# One limiter per provider + model scope, shared by all instances
+_limiters: Dict[str, TokenBucketLimiter] = {}
+
+def _limiter_scope(func, args) -> Tuple[str, Dict[str, Any]]:
+    """
+    Scope for a call, provider class + model name for provider methods.
+    Also returns the `rate_limit` overrides from the provider config, if any.
+    """
+    instance = args[0] if args else None
+    config = getattr(instance, "config", None)
+    if config is None:
+        return func.__qualname__, {}
+    model_name = getattr(config, "model_name", None)
+    overrides = (getattr(config, "provider_config", None) or {}).get("rate_limit", {})
+    return f"{type(instance).__name__}:{model_name}", overrides
+
+def rate_limited(calls_per_second: float,
+                 burst: int = 1,
+                 max_concurrency: Optional[int] = None):
+    """
+    Decorator to limit async function call rate with a token bucket.
+
+    Limits are scoped per provider class and model, so unrelated providers
+    don't queue behind each other. Any of the args can be overridden per
+    provider with `{"rate_limit": {...}}` in its provider config.
+    A RetryableAPIError with reason RESOURCE_EXHAUSTED halves the rate (AIMD).
 
-    Ensures that the decorated async function is not called
-    more than `calls_per_second` times per second.
-    
     Args:
-        calls_per_second: Maximum number of allowed calls per second.
-    
+        calls_per_second: Sustained number of allowed calls per second.
+        burst: Number of calls allowed back to back before throttling.
+        max_concurrency: Max in-flight calls for the scope, None for unbounded.
+
     Usage:
-        @rate_limited(2.0)  # 2 calls per second (120 per minute)
+        @rate_limited(2.0, burst=4, max_concurrency=8)
         async def call_external_service_func(...):
             ...
     """
-    min_interval = 1.0 / calls_per_second
-    last_call = {"time": 0.0}
-    # protects shared timing state
-    lock = asyncio.Lock()
-
     def decorator(func):
         @functools.wraps(func)
         async def _wrapper(*args, **kwargs):
-            loop = asyncio.get_running_loop()
-            async with lock:
-                now = loop.time()
-                elapsed = now - last_call["time"]
-                wait_time = min_interval - elapsed
-                if wait_time > 0:
-                    logger.warning(
-                        f"Rate limit exceeded for {func.__name__}, "
-                        f"sleeping {wait_time:.3f}s to respect limit."
-                    )
-                    await asyncio.sleep(wait_time)
-                # Make note of the new call time
-                last_call["time"] = loop.time()
-            # execute the actual function after rate check
-            return await func(*args, **kwargs)
+            scope, overrides = _limiter_scope(func, args)
+            limiter = _limiters.get(scope)
+            if limiter is None:
+                limiter = TokenBucketLimiter(
+                    name=scope,
+                    calls_per_second=overrides.get("calls_per_second", calls_per_second),
+                    burst=overrides.get("burst", burst),
+                    max_concurrency=overrides.get("max_concurrency", max_concurrency),
+                    min_calls_per_second=overrides.get("min_calls_per_second")
+                )
+                _limiters[scope] = limiter
+
+            async with limiter:
+                try:
+                    result = await func(*args, **kwargs)
+                except RetryableAPIError as e:
+                    if e.reason == "RESOURCE_EXHAUSTED":
+                        limiter.on_throttled()
+                    raise
+            limiter.on_success()
+            return result
         return _wrapper
     return decorator
@@ -0,0 +1,5 @@
+"""Token count estimates for sizing prompts when the provider's tokenizer is not at hand"""
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, about 4 characters per token for most tokenizers"""
+    return len(text) // 4 + 1
@@ -0,0 +1,19 @@
+"""Shared fakes for the tests"""
+import pytest
+
+from memsrv.embeddings.base_embedder import BaseEmbedding
+
+class RecordingEmbedding(BaseEmbedding):
+    """Embeds a text as [len(text)] and remembers every call"""
+    def __init__(self, **config):
+        super().__init__(config={"model_name": "fake", "api_key": "", **config})
+        self.calls = []
+
+    async def generate_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+@pytest.fixture
+def recording_embedding():
+    """Factory for recording embedders, keyword args go into the embedding config"""
+    return RecordingEmbedding
@@ -0,0 +1,61 @@
+"""BlockingDBExecutor runs reads side by side and writes one at a time"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from memsrv.db.executor import BlockingDBExecutor
+
+class Tracker:
+    """Blocking call that records how many copies ran at once"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def call(self, value):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self._lock:
+            self.running -= 1
+        return value
+
+@pytest.fixture
+def executor():
+    pool = BlockingDBExecutor(name="test_executor", max_workers=4)
+    yield pool
+    pool.shutdown()
+
+async def test_reads_run_concurrently(executor):
+    tracker = Tracker()
+
+    results = await asyncio.gather(*(executor.read(tracker.call, i) for i in range(4)))
+
+    assert results == [0, 1, 2, 3]
+    assert tracker.peak == 4
+
+async def test_writes_are_serialized(executor):
+    tracker = Tracker()
+
+    await asyncio.gather(*(executor.write(tracker.call, i) for i in range(4)))
+
+    assert tracker.peak == 1
+
+async def test_calls_beyond_the_pool_wait_for_a_worker(executor):
+    tracker = Tracker()
+
+    await asyncio.gather(*(executor.read(tracker.call, i) for i in range(10)))
+
+    assert tracker.peak == 4
+
+async def test_errors_reach_the_caller(executor):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        await executor.write(fail)
+    # The write lock was released
+    assert await executor.write(lambda: "ok") == "ok"
@@ -0,0 +1,68 @@
+"""Writes and reads through the embedded adapters and their blocking executor"""
+import pytest
+
+from memsrv.core.memory_service import MemoryService
+from memsrv.db.adapters.chroma_lite import ChromaLiteDBAdapter
+from memsrv.db.adapters.hnsw_lite import HnswLiteDBAdapter
+from memsrv.db.adapters.numpy_mmap import NumpyMmapDBAdapter
+from memsrv.models.memory import MemoryInDB, MemoryMetadata, MemoryUpdatePayload
+from memsrv.models.request import MemoryUpdateRequest
+
+METADATA = MemoryMetadata(user_id="u1", app_id="app", session_id="s1", agent_name="agent")
+
+@pytest.fixture(params=[ChromaLiteDBAdapter, NumpyMmapDBAdapter, HnswLiteDBAdapter],
+                ids=["chroma_lite", "numpy", "hnsw_lite"])
+async def adapter(request, tmp_path):
+    """An empty embedded store with 2-dim embeddings"""
+    db = request.param(collection_name="memories",
+                       description="test memories",
+                       embedding_dim=2,
+                       persist_dir=str(tmp_path))
+    await db.setup_database()
+    yield db
+    await db.close()
+
+async def test_add_update_delete(adapter):
+    ids = await adapter.add(items=[
+        MemoryInDB(document="likes tea", embedding=[1.0, 0.0], metadata=METADATA),
+        MemoryInDB(document="lives in Paris", embedding=[0.0, 1.0], metadata=METADATA),
+    ])
+
+    updated = await adapter.update(items=[
+        MemoryUpdatePayload(id=ids[0], document="likes coffee", embedding=[1.0, 0.1]),
+        MemoryUpdatePayload(id="missing", document="ghost", embedding=[1.0, 1.0]),
+    ])
+    assert updated == [ids[0]]
+
+    nearest = await adapter.query_by_similarity(query_embeddings=[[1.0, 0.0]], top_k=1)
+    assert nearest.documents[0] == ["likes coffee"]
+
+    assert await adapter.delete(fact_ids=[ids[1], "missing"]) == [ids[1]]
+    remaining = await adapter.query_by_filter(filters={"user_id": "u1"}, limit=10)
+    assert remaining.ids[0] == [ids[0]]
+    assert (await adapter.get_by_ids(ids=[ids[1]])).ids[0] == []
+
+async def test_missing_ids_are_reported_not_found(adapter, recording_embedding):
+    class TwoDimEmbedding(recording_embedding):
+        async def generate_embeddings(self, texts):
+            return [[1.0, float(len(text))] for text in texts]
+
+    service = MemoryService(llm=None, db_adapter=adapter, embedder=TwoDimEmbedding())
+    [memory_id] = await adapter.add(items=[
+        MemoryInDB(document="likes tea", embedding=[1.0, 0.0], metadata=METADATA),
+    ])
+
+    actions, partial_failure = await service.update_raw_memories(update_items=[
+        MemoryUpdateRequest(id=memory_id, document="likes green tea"),
+        MemoryUpdateRequest(id="missing", document="ghost"),
+    ])
+    assert partial_failure
+    assert [(action.id, action.status) for action in actions] == \
+        [(memory_id, "UPDATED"), ("missing", "NOT_FOUND")]
+
+    actions, partial_failure = await service.delete_raw_memories_by_id(
+        memory_ids=[memory_id, "missing"]
+    )
+    assert partial_failure
+    assert [(action.id, action.status) for action in actions] == \
+        [(memory_id, "DELETED"), ("missing", "NOT_FOUND")]
@@ -0,0 +1,58 @@
+"""BatchingEmbedding coalesces concurrent callers into provider sized batches"""
+import asyncio
+
+import pytest
+
+from memsrv.embeddings.batcher import BatchingEmbedding
+from memsrv.utils.exceptions import APIError
+
+async def test_concurrent_callers_share_a_batch(recording_embedding):
+    provider = recording_embedding()
+    batcher = BatchingEmbedding(provider, max_wait_ms=10, max_batch_size=10)
+
+    first, second = await asyncio.gather(
+        batcher.generate_embeddings(["a", "bb"]),
+        batcher.generate_embeddings(["ccc"]),
+    )
+
+    assert first == [[1.0], [2.0]]
+    assert second == [[3.0]]
+    assert provider.calls == [["a", "bb", "ccc"]]
+
+async def test_batches_split_at_max_batch_size(recording_embedding):
+    provider = recording_embedding()
+    batcher = BatchingEmbedding(provider, max_wait_ms=10, max_batch_size=2)
+
+    first, second = await asyncio.gather(
+        batcher.generate_embeddings(["a", "bb", "ccc"]),
+        batcher.generate_embeddings(["dddd", "eeeee"]),
+    )
+
+    assert first == [[1.0], [2.0], [3.0]]
+    assert second == [[4.0], [5.0]]
+    assert provider.calls == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+async def test_short_provider_answer_fails_every_caller(recording_embedding):
+    class ShortEmbedding(recording_embedding):
+        async def generate_embeddings(self, texts):
+            return (await super().generate_embeddings(texts))[:-1]
+
+    batcher = BatchingEmbedding(ShortEmbedding(), max_wait_ms=10, max_batch_size=10)
+
+    results = await asyncio.wait_for(asyncio.gather(
+        batcher.generate_embeddings(["a"]),
+        batcher.generate_embeddings(["bb"]),
+        return_exceptions=True,
+    ), timeout=1)
+
+    assert all(isinstance(result, APIError) for result in results)
+
+async def test_provider_error_reaches_the_callers(recording_embedding):
+    class FailingEmbedding(recording_embedding):
+        async def generate_embeddings(self, texts):
+            raise APIError("provider down")
+
+    batcher = BatchingEmbedding(FailingEmbedding(), max_wait_ms=10)
+
+    with pytest.raises(APIError, match="provider down"):
+        await batcher.generate_embeddings(["a"])
@@ -0,0 +1,51 @@
+"""CachedEmbedding only forwards texts it has not seen to the provider"""
+from memsrv.embeddings.cache import CachedEmbedding, LRUEmbeddingStore
+
+async def test_hits_skip_the_provider(recording_embedding):
+    provider = recording_embedding()
+    cached = CachedEmbedding(provider)
+
+    assert await cached.generate_embeddings(["a", "bb"]) == [[1.0], [2.0]]
+    assert await cached.generate_embeddings(["bb", "ccc", "a"]) == [[2.0], [3.0], [1.0]]
+
+    assert provider.calls == [["a", "bb"], ["ccc"]]
+    assert cached.stats == {"hits": 2, "misses": 3, "size": 3}
+
+async def test_duplicates_in_a_call_are_embedded_once(recording_embedding):
+    provider = recording_embedding()
+    cached = CachedEmbedding(provider)
+
+    assert await cached.generate_embeddings(["a", "a", "bb"]) == [[1.0], [1.0], [2.0]]
+    assert provider.calls == [["a", "bb"]]
+
+async def test_model_change_is_a_miss(recording_embedding):
+    first = CachedEmbedding(recording_embedding())
+    await first.generate_embeddings(["a"])
+
+    other_dims = recording_embedding(embedding_dims=256)
+    cached = CachedEmbedding(other_dims)
+    cached.memory_store = first.memory_store
+    await cached.generate_embeddings(["a"])
+
+    assert other_dims.calls == [["a"]]
+
+async def test_disk_tier_survives_a_restart(tmp_path, recording_embedding):
+    path = str(tmp_path / "embeddings.db")
+    await CachedEmbedding(recording_embedding(), disk_path=path).generate_embeddings(["a", "bb"])
+
+    provider = recording_embedding()
+    restarted = CachedEmbedding(provider, disk_path=path)
+
+    assert await restarted.generate_embeddings(["bb", "a"]) == [[2.0], [1.0]]
+    assert not provider.calls
+
+def test_lru_evicts_least_recently_used():
+    store = LRUEmbeddingStore(max_size=2)
+    store.put("a", [1.0])
+    store.put("b", [2.0])
+    store.get("a")
+    store.put("c", [3.0])
+
+    assert store.get("b") is None
+    assert store.get("a") == [1.0]
+    assert len(store) == 2
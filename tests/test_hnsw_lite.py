@@ -0,0 +1,72 @@
+"""HnswStore reloads its graph from the last snapshot plus the wal"""
+import pytest
+
+pytest.importorskip("hnswlib")
+
+from memsrv.db.adapters.hnsw_lite import HnswLiteDBAdapter, HnswStore
+
+def record(fact_id):
+    """A row of the memories table for fact_id"""
+    return {"id": fact_id, "document": f"fact {fact_id}", "user_id": "u1", "app_id": "app",
+            "session_id": "s1", "agent_name": "agent", "event_timestamp": None,
+            "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00"}
+
+def open_store(path, snapshot_every=3):
+    settings = HnswLiteDBAdapter(collection_name="memories", description="",
+                                 embedding_dim=2, persist_dir=str(path),
+                                 provider_config={"snapshot_every": snapshot_every}).settings
+    return HnswStore(path=str(path / "memories_hnsw"), dims=2, settings=settings)
+
+def crash(store):
+    """Drops the store without the snapshot a clean close would take"""
+    store._conn.close()
+
+def wal_size(store):
+    return store._conn.execute("SELECT COUNT(*) FROM wal").fetchone()[0]
+
+def graph_labels(store):
+    """Labels the graph walk returns, i.e. the live nodes of the graph"""
+    [matches] = store._knn([[1.0, 0.0]], k=len(store.labels), label_filter=None)
+    return {label for label, _ in matches}
+
+def test_snapshot_truncates_the_wal(tmp_path):
+    store = open_store(tmp_path)
+    store.upsert([record("a")], [[1.0, 0.0]])
+    store.upsert([record("b")], [[0.0, 1.0]])
+    assert wal_size(store) == 2
+
+    store.upsert([record("c")], [[1.0, 1.0]])
+    assert wal_size(store) == 0
+    store.close()
+
+def test_restart_replays_the_wal_after_the_snapshot(tmp_path):
+    store = open_store(tmp_path, snapshot_every=4)
+    for fact_id, vector in [("a", [1.0, 0.0]), ("b", [0.0, 1.0]), ("c", [1.0, 1.0]), ("e", [1.0, -1.0])]:
+        store.upsert([record(fact_id)], [vector])
+    # Not covered by the snapshot taken at the fourth change
+    store.delete(["b"])
+    store.upsert([record("d")], [[-1.0, 0.0]])
+    store.update([{"id": "a", "document": "fact a2", "updated_at": "2026-01-02T00:00:00"}],
+                 [[0.0, -1.0]])
+    crash(store)
+
+    restarted = open_store(tmp_path, snapshot_every=100)
+
+    assert restarted._changes_since_snapshot == 3
+    assert set(restarted.id_to_label) == {"a", "c", "d", "e"}
+    assert graph_labels(restarted) == {restarted.id_to_label[fact_id] for fact_id in "acde"}
+    [[(label, score)]] = restarted.search([[0.0, -1.0]], filters=None, top_k=1)
+    assert label == restarted.id_to_label["a"]
+    assert score == pytest.approx(1.0)
+    restarted.close()
+
+def test_clean_close_leaves_nothing_to_replay(tmp_path):
+    store = open_store(tmp_path)
+    store.upsert([record("a")], [[1.0, 0.0]])
+    store.close()
+
+    restarted = open_store(tmp_path)
+
+    assert restarted._changes_since_snapshot == 0
+    assert graph_labels(restarted) == {restarted.id_to_label["a"]}
+    restarted.close()
@@ -0,0 +1,105 @@
+"""Repeats of a generate request share the first execution's result"""
+import asyncio
+
+import pytest
+
+from memsrv.core.idempotency import GenerateResultCache, generate_request_key
+from memsrv.models.memory import MemoryMetadata
+
+def metadata(user_id="u1", event_timestamp="2026-01-01T00:00:00+00:00"):
+    return MemoryMetadata(user_id=user_id, app_id="app", session_id="s1",
+                          agent_name="agent", event_timestamp=event_timestamp)
+
+def messages(text):
+    return [{"role": "user", "parts": [{"text": text}]}]
+
+class CountingCompute:
+    """Compute fn that counts its runs and finishes when released"""
+    def __init__(self, result="actions", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+def test_key_ignores_whitespace_and_the_server_timestamp():
+    key = generate_request_key(messages("I moved to  Berlin"), metadata())
+
+    assert key == generate_request_key(messages("I moved to Berlin\n"),
+                                       metadata(event_timestamp="2026-02-01T00:00:00+00:00"))
+    assert key != generate_request_key(messages("I moved to Paris"), metadata())
+    assert key != generate_request_key(messages("I moved to Berlin"), metadata(user_id="u2"))
+
+def test_client_key_replaces_the_conversation_hash():
+    key = generate_request_key(messages("I moved to Berlin"), metadata(), idempotency_key="req-1")
+
+    assert key == generate_request_key(messages("anything"), metadata(), idempotency_key="req-1")
+    assert key != generate_request_key(messages("anything"), metadata(user_id="u2"),
+                                       idempotency_key="req-1")
+
+async def test_concurrent_callers_share_one_compute():
+    cache = GenerateResultCache()
+    compute = CountingCompute()
+
+    callers = [asyncio.create_task(cache.run("key", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await asyncio.gather(*callers) == ["actions"] * 5
+    assert compute.calls == 1
+
+async def test_repeat_within_the_ttl_is_served_from_the_cache():
+    cache = GenerateResultCache(ttl_seconds=0.05)
+    compute = CountingCompute()
+    compute.release.set()
+
+    await cache.run("key", compute)
+    await cache.run("key", compute)
+    assert compute.calls == 1
+
+    await asyncio.sleep(0.06)
+    await cache.run("key", compute)
+    assert compute.calls == 2
+
+async def test_failures_are_not_stored():
+    cache = GenerateResultCache()
+    failing = CountingCompute(error=RuntimeError("llm unavailable"))
+    failing.release.set()
+
+    with pytest.raises(RuntimeError):
+        await cache.run("key", failing)
+
+    retry = CountingCompute()
+    retry.release.set()
+    assert await cache.run("key", retry) == "actions"
+
+async def test_cancelled_first_caller_does_not_cancel_the_compute():
+    cache = GenerateResultCache()
+    compute = CountingCompute()
+
+    first = asyncio.create_task(cache.run("key", compute))
+    await asyncio.sleep(0)
+    retry = asyncio.create_task(cache.run("key", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    compute.release.set()
+
+    assert await retry == "actions"
+    assert compute.calls == 1
+
+async def test_oldest_entries_are_evicted():
+    cache = GenerateResultCache(max_entries=2)
+    compute = CountingCompute()
+    compute.release.set()
+
+    for key in ("a", "b", "c"):
+        await cache.run(key, compute)
+    await cache.run("a", compute)
+
+    assert compute.calls == 4
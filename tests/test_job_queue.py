@@ -0,0 +1,86 @@
+"""Generate jobs survive restarts and finished ones are purged after the retention"""
+import asyncio
+
+from memsrv.core.job_queue import GenerateJobQueue, JobStore
+from memsrv.models.memory import MemoryMetadata
+from memsrv.models.response import ActionConfirmation
+
+METADATA = MemoryMetadata(user_id="u1", app_id="app", session_id="s1", agent_name="agent")
+MESSAGES = [{"role": "user", "parts": [{"text": "I moved to Berlin"}]}]
+
+class FakeMemoryService:
+    """Creates one memory per job, or fails, or hangs until cancelled"""
+    def __init__(self, mode="succeed"):
+        self.mode = mode
+        self.started = asyncio.Event()
+
+    async def add_memories_from_conversation(self, messages, metadata):
+        self.started.set()
+        if self.mode == "hang":
+            await asyncio.Event().wait()
+        if self.mode == "fail":
+            raise RuntimeError("llm unavailable")
+        return [ActionConfirmation(id="m1", document="Lives in Berlin", status="CREATED")]
+
+async def wait_for_status(queue, job_id, status):
+    async def poll():
+        while (await queue.get(job_id))["status"] != status:
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout=2)
+    return await queue.get(job_id)
+
+async def test_jobs_running_at_shutdown_are_requeued(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    queue = GenerateJobQueue(FakeMemoryService(mode="hang"), path=path, workers=1, retention_seconds=0)
+    await queue.start()
+    job = await queue.enqueue(messages=MESSAGES, metadata=METADATA)
+    await wait_for_status(queue, job["id"], "RUNNING")
+    await queue.stop()
+
+    restarted = GenerateJobQueue(FakeMemoryService(), path=path, workers=1, retention_seconds=0)
+    await restarted.start()
+    finished = await wait_for_status(restarted, job["id"], "SUCCEEDED")
+    await restarted.stop()
+
+    assert finished["payload"]["messages"] == MESSAGES
+    assert finished["result"] == [{"id": "m1", "document": "Lives in Berlin", "status": "CREATED"}]
+
+async def test_failed_job_does_not_stop_the_worker(tmp_path):
+    service = FakeMemoryService(mode="fail")
+    queue = GenerateJobQueue(service, path=str(tmp_path / "jobs.sqlite"), workers=1, retention_seconds=0)
+    await queue.start()
+
+    failed = await queue.enqueue(messages=MESSAGES, metadata=METADATA)
+    assert (await wait_for_status(queue, failed["id"], "FAILED"))["error"] == "llm unavailable"
+
+    service.mode = "succeed"
+    succeeded = await queue.enqueue(messages=MESSAGES, metadata=METADATA)
+    await wait_for_status(queue, succeeded["id"], "SUCCEEDED")
+    await queue.stop()
+
+def test_purge_keeps_unfinished_and_recent_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    for job_id in ("queued", "running", "succeeded", "failed"):
+        store.insert(job_id, {"messages": []})
+    store.set_status("running", "RUNNING")
+    store.set_status("succeeded", "SUCCEEDED", result=[])
+    store.set_status("failed", "FAILED", error="boom")
+
+    assert store.purge_finished(older_than="2000-01-01T00:00:00+00:00") == 0
+    assert store.purge_finished(older_than="9999-01-01T00:00:00+00:00") == 2
+    assert store.get("succeeded") is None
+    assert sorted(store.unfinished()) == ["queued", "running"]
+    store.close()
+
+async def test_purge_uses_the_retention(tmp_path):
+    queue = GenerateJobQueue(FakeMemoryService(), path=str(tmp_path / "jobs.sqlite"),
+                             workers=1, retention_seconds=3600)
+    queue.store.insert("old", {"messages": []})
+    queue.store.set_status("old", "SUCCEEDED", result=[])
+
+    assert await queue.purge() == 0
+
+    queue.retention_seconds = 0
+    assert await queue.purge() == 1
+    queue.executor.shutdown()
+    queue.store.close()
@@ -0,0 +1,28 @@
+"""HeuristicPrefilter only skips conversations that surely hold no facts"""
+import pytest
+
+from memsrv.core.prefilter import HeuristicPrefilter
+
+@pytest.mark.parametrize("turns", [
+    ["User: hi", "Assistant: Hello! How can I help?"],
+    ["User: thanks", "Assistant: You're welcome."],
+    ["User: Hello, how are you?"],
+])
+async def test_chatter_is_skipped(turns):
+    assert not await HeuristicPrefilter().may_contain_facts(turns)
+
+@pytest.mark.parametrize("turns", [
+    ["Assistant: Any peanut allergy?", "User: no"],
+    ["Assistant: Are you vegetarian?", "User: yes"],
+    ["Assistant: Shall I book the window seat as usual?", "User: sure, ok"],
+    # With watermarks the question came in an earlier request
+    ["User: yes"],
+    ["User: hi, I moved to Berlin"],
+    ["User: こんにちは"],
+])
+async def test_possible_facts_are_kept(turns):
+    assert await HeuristicPrefilter().may_contain_facts(turns)
+
+async def test_long_turns_are_kept():
+    prefilter = HeuristicPrefilter({"max_chatter_words": 2})
+    assert await prefilter.may_contain_facts(["User: hello hello hello"])
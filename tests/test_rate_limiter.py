@@ -0,0 +1,81 @@
+"""Token bucket limits with AIMD backoff on provider throttling"""
+import asyncio
+
+import pytest
+
+from memsrv.utils import retry
+from memsrv.utils.retry import TokenBucketLimiter, rate_limited
+from memsrv.utils.exceptions import RetryableAPIError
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    """Limiters are shared per scope, keep each test's to itself"""
+    monkeypatch.setattr(retry, "_limiters", {})
+
+def test_throttling_halves_the_rate_down_to_the_floor():
+    limiter = TokenBucketLimiter("test", calls_per_second=8, burst=4, min_calls_per_second=3)
+
+    limiter.on_throttled()
+    assert limiter.rate == 4
+    assert limiter.tokens == 0
+
+    limiter.on_throttled()
+    assert limiter.rate == 3
+
+def test_success_adds_back_a_tenth_of_the_rate():
+    limiter = TokenBucketLimiter("test", calls_per_second=10)
+    limiter.on_throttled()
+
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(6)
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == 10
+
+async def test_callers_past_the_burst_wait_for_their_token():
+    limiter = TokenBucketLimiter("test", calls_per_second=20, burst=2)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+
+    # Two tokens up front, the other two refill at 20/s
+    assert loop.time() - start == pytest.approx(0.1, abs=0.05)
+
+class FakeProvider:
+    """Provider method throttled on demand, records its peak concurrency"""
+    def __init__(self, model_name, rate_limit=None):
+        self.config = type("Config", (), {
+            "model_name": model_name,
+            "provider_config": {"rate_limit": rate_limit or {}},
+        })()
+        self.throttle = False
+        self.in_flight = 0
+        self.peak = 0
+
+    @rate_limited(calls_per_second=1000, burst=100)
+    async def call(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.throttle:
+            raise RetryableAPIError("slow down", reason="RESOURCE_EXHAUSTED")
+
+async def test_resource_exhausted_backs_off_only_its_scope():
+    throttled, other = FakeProvider("model-a"), FakeProvider("model-b")
+    await asyncio.gather(throttled.call(), other.call())
+
+    throttled.throttle = True
+    with pytest.raises(RetryableAPIError):
+        await throttled.call()
+
+    assert retry._limiters["FakeProvider:model-a"].rate == 500
+    assert retry._limiters["FakeProvider:model-b"].rate == 1000
+
+async def test_provider_config_overrides_the_limits():
+    provider = FakeProvider("model-c", rate_limit={"max_concurrency": 2})
+
+    await asyncio.gather(*(provider.call() for _ in range(6)))
+
+    assert provider.peak == 2
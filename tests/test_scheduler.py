@@ -0,0 +1,110 @@
+"""Consolidation runs are serialized per scope and queued batches are merged"""
+import asyncio
+
+import pytest
+
+from memsrv.core.scheduler import ConsolidationScheduler
+from memsrv.models.memory import MemoryMetadata
+
+def metadata(user_id="u1", session_id="s1"):
+    return MemoryMetadata(user_id=user_id, app_id="app", session_id=session_id, agent_name="agent")
+
+class RecordingConsolidate:
+    """Consolidate fn that records its runs and how many overlapped per scope"""
+    def __init__(self):
+        self.runs = []
+        self.running = {}
+        self.peak = {}
+        self.peak_total = 0
+
+    async def __call__(self, facts, meta):
+        self.runs.append(facts)
+        self.running[meta.user_id] = self.running.get(meta.user_id, 0) + 1
+        self.peak[meta.user_id] = max(self.peak.get(meta.user_id, 0), self.running[meta.user_id])
+        self.peak_total = max(self.peak_total, sum(self.running.values()))
+        await asyncio.sleep(0.01)
+        self.running[meta.user_id] -= 1
+        if "bad fact" in facts:
+            raise ValueError("invalid plan")
+        return [f"created {fact}" for fact in facts]
+
+async def test_same_scope_runs_one_at_a_time_other_scopes_in_parallel():
+    consolidate = RecordingConsolidate()
+    scheduler = ConsolidationScheduler(consolidate, merge_batches=False)
+
+    await asyncio.gather(
+        *(scheduler.submit([f"fact {i}"], metadata()) for i in range(3)),
+        *(scheduler.submit([f"fact {i}"], metadata(user_id="u2")) for i in range(3)),
+    )
+
+    assert consolidate.peak == {"u1": 1, "u2": 1}
+    assert consolidate.peak_total == 2
+    assert len(consolidate.runs) == 6
+
+async def started(scheduler, facts, consolidate):
+    """Submits facts and waits until their run is underway"""
+    task = asyncio.create_task(scheduler.submit(facts, metadata()))
+    while not consolidate.runs:
+        await asyncio.sleep(0)
+    return task
+
+async def test_queued_batches_of_a_session_merge_into_one_run():
+    consolidate = RecordingConsolidate()
+    scheduler = ConsolidationScheduler(consolidate)
+
+    first, second, third, other_session = await asyncio.gather(
+        await started(scheduler, ["a"], consolidate),
+        scheduler.submit(["b", "c"], metadata()),
+        scheduler.submit(["c", "d"], metadata()),
+        scheduler.submit(["e"], metadata(session_id="s2")),
+    )
+
+    assert consolidate.runs == [["a"], ["b", "c", "d"], ["e"]]
+    assert first == ["created a"]
+    assert second == third == ["created b", "created c", "created d"]
+    assert other_session == ["created e"]
+
+async def test_errors_reach_every_merged_caller_and_the_scope_continues():
+    consolidate = RecordingConsolidate()
+    scheduler = ConsolidationScheduler(consolidate)
+
+    results = await asyncio.gather(
+        await started(scheduler, ["a"], consolidate),
+        scheduler.submit(["bad fact"], metadata()),
+        scheduler.submit(["b"], metadata()),
+        return_exceptions=True,
+    )
+
+    assert results[0] == ["created a"]
+    assert all(isinstance(result, ValueError) for result in results[1:])
+    assert await scheduler.submit(["c"], metadata()) == ["created c"]
+
+async def test_exclusive_runs_never_overlap_consolidation():
+    consolidate = RecordingConsolidate()
+    scheduler = ConsolidationScheduler(consolidate)
+
+    async def fused_run():
+        return await consolidate(["fused"], metadata())
+
+    results = await asyncio.gather(
+        scheduler.submit(["a"], metadata()),
+        scheduler.run_exclusive(metadata(), fused_run),
+        scheduler.submit(["b"], metadata(session_id="s2")),
+    )
+
+    assert results[1] == ["created fused"]
+    assert consolidate.peak == {"u1": 1}
+
+async def test_cancelled_caller_is_skipped():
+    consolidate = RecordingConsolidate()
+    scheduler = ConsolidationScheduler(consolidate, merge_batches=False)
+
+    first = asyncio.create_task(scheduler.submit(["a"], metadata()))
+    queued = asyncio.create_task(scheduler.submit(["b"], metadata()))
+    await asyncio.sleep(0)
+    queued.cancel()
+
+    assert await first == ["created a"]
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert consolidate.runs == [["a"]]